@@ -16,7 +16,7 @@ with open(os.path.join("src", "llm_chat", "__version__.py"), encoding="utf-8") a
 install_requires = []
 # Streamlit project dependencies
 install_requires.extend([
-    "streamlit>=1.30.0",
+    "streamlit>=1.37.0",
     "pandas>=2.0.0",
     "numpy>=1.24.0",
 ])
@@ -31,6 +31,7 @@ setup(
     author_email="jar285@njit.edu",
     packages=find_packages(where="src"),
     package_dir={"": "src"},
+    package_data={"llm_chat": ["ui/static/*.css"]},
     python_requires=">=3.10",
     install_requires=install_requires,
     classifiers=[
@@ -1,28 +1,94 @@
 """Streamlit application configuration and state management."""
 import streamlit as st
 import logging
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
+from functools import lru_cache
 import os
 from typing import Dict, Any, List, Optional
 
 # Import from your modules
-from .chat.client import ChatClient
+from .chat.client import ChatClient, SemanticCache
 from .chat.history import ChatHistoryManager
 from .chat.message import Message, Conversation
 from .chat.system_prompts import system_prompt_manager
 from .config.settings import get_app_config, get_default_settings
-from .ui.styles import apply_theme
-from .ui.chat_ui import render_message, render_header, render_chat_input
-from .ui.sidebar import render_settings_sidebar, render_about_sidebar, render_conversation_sidebar
+from .ui.styles import apply_static_css, apply_theme
+from .ui.chat_ui import (
+    render_message, render_conversation, render_streaming_message, render_header, render_chat_input
+)
+from .ui.sidebar import (
+    render_settings_sidebar, render_about_sidebar, render_conversation_sidebar,
+    reset_conversation_selector
+)
 from .utils.helpers import sanitize_html_content
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
+# Single worker so writes to the same conversation file stay ordered
+_SAVE_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="history-save")
 
-def setup_page_config():
-    """Configure the Streamlit page."""
-    config = get_app_config()
+# Text for the "About this application" expander
+_ABOUT_TEXT = """
+This is a Streamlit-based chat application that uses OpenAI's API to generate responses.
+
+Features:
+- Chat with various OpenAI models
+- Choose different assistant types with specialized expertise
+- Adjust model parameters like temperature and max tokens
+- Save and load conversations
+- Create multiple conversation threads
+
+To use this application, make sure you have an OpenAI API key in your .env file.
+"""
+
+
+@lru_cache(maxsize=32)
+def _assistant_card_html(type_id: str) -> str:
+    """Build the header card HTML for an assistant type.
+    
+    Args:
+        type_id: ID of the assistant type
+        
+    Returns:
+        HTML string for the card (empty if the type is unknown)
+    """
+    assistant_type = system_prompt_manager.get_assistant_type(type_id)
+    if not assistant_type:
+        return ""
+    return f"""
+    <div style="display: flex; align-items: center; margin-bottom: 1.5rem; 
+                padding: 1rem 1.5rem; background-color: white; 
+                border-radius: 1rem; box-shadow: 0 1px 3px rgba(0,0,0,0.12), 0 1px 2px rgba(0,0,0,0.24);">
+        <div style="font-size: 2.5rem; margin-right: 1rem;">{assistant_type.icon}</div>
+        <div style="flex-grow: 1;">
+            <div style="font-weight: 600; font-size: 1.25rem; margin-bottom: 0.25rem; color: #333;">{assistant_type.name}</div>
+            <div style="font-size: 0.9rem; color: #666; line-height: 1.4;">{assistant_type.description}</div>
+        </div>
+    </div>
+    """
+
+
+def _welcome_message(type_id: str) -> Message:
+    """Create the welcome message for a new conversation.
+    
+    Args:
+        type_id: ID of the current assistant type
+        
+    Returns:
+        The assistant welcome message
+    """
+    return Message.assistant_message(system_prompt_manager.get_welcome_message(type_id))
+
+
+def setup_page_config(config: Optional[Dict[str, Any]] = None):
+    """Configure the Streamlit page.
+    
+    Args:
+        config: Application configuration (defaults to get_app_config())
+    """
+    config = config or get_app_config()
     
     st.set_page_config(
         page_title=config["app_name"],
@@ -31,6 +97,39 @@ def setup_page_config():
     )
 
 
+@st.cache_resource
+def get_history_manager() -> ChatHistoryManager:
+    """Get the history manager shared by all sessions.
+    
+    Sharing one instance means its conversation listing is scanned from
+    disk once and reused until a save, rename or delete invalidates it.
+    """
+    return ChatHistoryManager()
+
+
+@st.cache_resource
+def get_chat_client(api_key: Optional[str]) -> ChatClient:
+    """Get a chat client shared by all sessions using the same API key.
+    
+    The client has no response cache of its own; see get_response_cache.
+    """
+    return ChatClient(api_key=api_key)
+
+
+def get_response_cache() -> Optional[SemanticCache]:
+    """Get this session's response cache, if the user turned caching on.
+    
+    The cache lives in session state, so answers are never shared between
+    sessions, and it is not persisted to disk. Since the user opted in, it
+    also serves completions sampled at a non-zero temperature.
+    """
+    if not st.session_state.settings.get("response_cache"):
+        return None
+    if "response_cache" not in st.session_state:
+        st.session_state.response_cache = SemanticCache(any_temperature=True)
+    return st.session_state.response_cache
+
+
 def init_session_state():
     """Initialize session state variables."""
     # Initialize settings if not exists
@@ -50,17 +149,15 @@ def init_session_state():
         st.session_state.conversation.set_system_prompt(system_prompt)
         
         # Add a welcome message
-        assistant_type = system_prompt_manager.get_assistant_type(st.session_state.assistant_type)
-        welcome_text = f"Hello! I'm your {assistant_type.name if assistant_type else 'AI Assistant'}. How can I help you today?"
-        welcome_msg = Message.assistant_message(welcome_text)
+        welcome_msg = _welcome_message(st.session_state.assistant_type)
         st.session_state.conversation.add_message(welcome_msg)
         
         # Log the welcome message for debugging
-        print(f"Welcome message content: {welcome_msg.content}")
+        logger.debug("Welcome message content: %s", welcome_msg.content)
     
     # Initialize history manager if not exists
     if "history_manager" not in st.session_state:
-        st.session_state.history_manager = ChatHistoryManager()
+        st.session_state.history_manager = get_history_manager()
     
     # UI state
     if "show_rename_ui" not in st.session_state:
@@ -69,15 +166,22 @@ def init_session_state():
     if "new_title" not in st.session_state:
         st.session_state.new_title = ""
     
+    # Number of assistant turns not yet written to disk
+    if "turns_since_save" not in st.session_state:
+        st.session_state.turns_since_save = 0
+    
     # Initialize API client
     if "api_client" not in st.session_state:
         config = get_app_config()
-        st.session_state.api_client = ChatClient(api_key=config["api_key"])
+        st.session_state.api_client = get_chat_client(config["api_key"])
 
 
 
 def create_new_conversation():
     """Create a new conversation."""
+    # Persist any unsaved turns of the conversation being replaced
+    flush_pending_save()
+    
     # Get the current assistant type
     current_assistant_type = st.session_state.get("assistant_type", "general")
     
@@ -86,16 +190,11 @@ def create_new_conversation():
     
     # Create new conversation with the system prompt
     st.session_state.conversation = Conversation(system_prompt=system_prompt)
-    
-    # Get the selected assistant type info
-    assistant_type = system_prompt_manager.get_assistant_type(current_assistant_type)
+    st.session_state.render_window = None
     
     # Add a welcome message
-    welcome_msg = Message.assistant_message(
-        f"Hello! I'm your {assistant_type.name if assistant_type else 'AI Assistant'}. How can I help you today?"
-    )
-    st.session_state.conversation.add_message(welcome_msg)
-    st.rerun()
+    st.session_state.conversation.add_message(_welcome_message(current_assistant_type))
+    reset_conversation_selector()
 
 
 def update_assistant_type(new_type: str):
@@ -114,15 +213,10 @@ def update_assistant_type(new_type: str):
     if "conversation" in st.session_state:
         st.session_state.conversation.set_system_prompt(system_prompt)
     
-    # Get the selected assistant type info
-    assistant_type = system_prompt_manager.get_assistant_type(new_type)
-
-    # Add a message about the switch with sanitization
-    if assistant_type:
-        switch_msg = Message.assistant_message(sanitize_html_content(
-            f"I'm now in {assistant_type.name} mode. How can I assist you?"
-        ))
-        st.session_state.conversation.add_message(switch_msg)
+    # Add a message about the switch (pre-sanitized)
+    switch_text = system_prompt_manager.get_switch_message(new_type)
+    if switch_text:
+        st.session_state.conversation.add_message(Message.assistant_message(switch_text))
 
 
 def load_conversation(conversation_id: str):
@@ -132,23 +226,29 @@ def load_conversation(conversation_id: str):
         conversation_id: ID of the conversation to load
     """
     try:
+        # Persist any unsaved turns of the conversation being replaced
+        flush_pending_save()
+        check_pending_save(wait=True)
+        
         history_manager = st.session_state.history_manager
         conversation_data = history_manager.load_conversation(conversation_id)
         loaded_conversation = Conversation.from_dict(conversation_data)
         
         # Update the assistant type based on the loaded conversation
         if loaded_conversation.system_prompt:
-            # Try to find an assistant type that matches this system prompt
-            for assistant_type in system_prompt_manager.get_all_assistant_types():
-                if assistant_type.system_prompt == loaded_conversation.system_prompt:
-                    st.session_state.assistant_type = assistant_type.id
-                    break
+            # Find the assistant type that matches this system prompt
+            assistant_type = system_prompt_manager.find_assistant_type_by_prompt(
+                loaded_conversation.system_prompt
+            )
+            if assistant_type:
+                st.session_state.assistant_type = assistant_type.id
         
         st.session_state.conversation = loaded_conversation
-        st.rerun()
+        st.session_state.render_window = None
+        reset_conversation_selector()
     except Exception as e:
         st.error(f"Error loading conversation: {str(e)}")
-        logger.error(f"Error loading conversation {conversation_id}: {str(e)}")
+        logger.error("Error loading conversation %s: %s", conversation_id, e)
 
 
 def rename_conversation(conversation_id: str, new_title: str):
@@ -157,6 +257,7 @@ def rename_conversation(conversation_id: str, new_title: str):
         st.error("Title cannot be empty")
         return
         
+    check_pending_save(wait=True)
     history_manager = st.session_state.history_manager
     success = history_manager.rename_conversation(conversation_id, new_title)
     
@@ -170,9 +271,6 @@ def rename_conversation(conversation_id: str, new_title: str):
         
     # Clear rename UI state
     st.session_state.show_rename_ui = False
-    
-    # Rerun to update UI
-    st.rerun()
 
 
 def delete_conversation(conversation_id: str):
@@ -182,6 +280,7 @@ def delete_conversation(conversation_id: str):
         conversation_id: ID of the conversation to delete
     """
     try:
+        check_pending_save(wait=True)
         history_manager = st.session_state.history_manager
         # Check if deleting current conversation
         current_id = getattr(st.session_state.conversation, "id", None)
@@ -192,50 +291,126 @@ def delete_conversation(conversation_id: str):
             st.success("Conversation deleted")
             # If deleting current conversation, create new one
             if conversation_id == current_id:
+                # Nothing left to save for the deleted conversation
+                st.session_state.turns_since_save = 0
                 create_new_conversation()
-            else:
-                st.rerun()
+            reset_conversation_selector()
         else:
             st.error("Failed to delete conversation")
     except Exception as e:
         st.error(f"Error deleting conversation: {str(e)}")
-        logger.error(f"Error deleting conversation {conversation_id}: {str(e)}")
+        logger.error("Error deleting conversation %s: %s", conversation_id, e)
+
+
+def _log_save_error(future: Future) -> None:
+    """Log errors raised by a background save."""
+    if future.cancelled():
+        return
+    error = future.exception()
+    if error is not None:
+        logger.error("Error saving conversation: %s", error)
+
+
+def check_pending_save(wait: bool = False) -> None:
+    """Report the outcome of the last background save.
+    
+    Args:
+        wait: Block until the pending save has finished
+    """
+    future = st.session_state.get("pending_save")
+    if future is None or (not wait and not future.done()):
+        return
+    
+    st.session_state.pending_save = None
+    error = future.exception()
+    if error is not None:
+        st.error(f"Error saving conversation: {str(error)}")
 
 
 def save_current_conversation():
-    """Save the current conversation to history."""
+    """Save the current conversation to history.
+    
+    The conversation is snapshotted on the script thread and written to disk
+    on a background thread so the UI does not wait for file I/O. A previous
+    save of this session that has not started yet is superseded by the new
+    snapshot, so queued writes are coalesced into one.
+    """
     try:
+        check_pending_save()
+        
+        # Drop a queued save that this snapshot makes redundant
+        previous = st.session_state.get("pending_save")
+        if previous is not None and previous.cancel():
+            logger.debug("Superseded queued save of conversation %s", st.session_state.conversation.id)
+        
         history_manager = st.session_state.history_manager
         conversation = st.session_state.conversation
         
         # Convert to dict for saving
         conversation_dict = conversation.to_dict()
         
-        # Save conversation with system prompt
-        conversation_id = history_manager.save_conversation(
+        # Assign the ID up front so later saves update the same file
+        if not conversation.id:
+            conversation.id = history_manager.generate_conversation_id()
+        
+        # Save conversation with system prompt in the background
+        future = _SAVE_EXECUTOR.submit(
+            history_manager.save_conversation,
             messages=conversation_dict["messages"],
             conversation_id=conversation.id,
             title=conversation.title,
             system_prompt=conversation.system_prompt
         )
+        future.add_done_callback(_log_save_error)
+        st.session_state.pending_save = future
+        st.session_state.turns_since_save = 0
         
-        # Update conversation ID
-        conversation.id = conversation_id
-        
-        st.success("Conversation saved successfully!")
-        
-        logger.info(f"Saved conversation {conversation_id} with system prompt")
+        logger.info("Queued save of conversation %s with system prompt", conversation.id)
         return True
     except Exception as e:
         st.error(f"Error saving conversation: {str(e)}")
-        logger.error(f"Error saving conversation: {str(e)}")
+        logger.error("Error saving conversation: %s", e)
         return False
 
 
-def process_user_input(user_input: str):
-    """Process user input and generate a response."""
+def flush_pending_save():
+    """Save the current conversation if it has turns not yet written to disk."""
+    if st.session_state.get("turns_since_save", 0) > 0:
+        save_current_conversation()
+
+
+def maybe_autosave_conversation():
+    """Save the current conversation every few turns instead of every turn.
+    
+    A conversation that has never been saved is written immediately and the
+    whole app is rerun, so it shows up in the history sidebar (a chat turn
+    otherwise only reruns the chat fragment).
+    """
+    st.session_state.turns_since_save = st.session_state.get("turns_since_save", 0) + 1
+    interval = get_app_config()["auto_save_interval"]
+    
+    if st.session_state.conversation.id is None:
+        if save_current_conversation():
+            # Let the write land before the sidebar lists conversations again
+            check_pending_save(wait=True)
+            reset_conversation_selector()
+            st.rerun(scope="app")
+    elif st.session_state.turns_since_save >= interval:
+        save_current_conversation()
+
+
+def process_user_input(user_input: str, assistant_type=None):
+    """Process user input and generate a response.
+    
+    Args:
+        user_input: Text entered by the user
+        assistant_type: Current assistant type, used to style the reply (optional)
+        
+    Returns:
+        bool: True if an assistant reply was added to the conversation
+    """
     if not user_input.strip():
-        return
+        return False
     
     # Get current conversation
     conversation = st.session_state.conversation
@@ -251,48 +426,106 @@ def process_user_input(user_input: str):
     api_client = st.session_state.api_client
     settings = st.session_state.settings
     
-    # Get AI response
-    with st.spinner("Thinking..."):
-        try:
-            # Format messages for API
-            api_messages = conversation.get_api_messages()
-            
-            response_text = api_client.get_completion(
-                messages=api_messages,
-                model=settings["model"],
-                temperature=settings["temperature"],
-                max_tokens=settings["max_tokens"]
-            )
-            
-            # Create assistant message - apply sanitization here
-            assistant_message = Message.assistant_message(sanitize_html_content(response_text))
-            conversation.add_message(assistant_message)
-            
-            # Save the conversation automatically
-            save_current_conversation()
-            
-            # Display assistant message
-            render_message(assistant_message)
-        except Exception as e:
-            st.error(f"Error generating response: {str(e)}")
-            logger.error(f"Error in process_user_input: {str(e)}")
-    
-    # Rerun to update UI
-    st.rerun()
+    # Get AI response, streaming tokens as they arrive
+    try:
+        # Format messages for API
+        api_messages = conversation.get_api_messages(
+            max_messages=get_app_config()["max_context_messages"]
+        )
+        
+        response_text = render_streaming_message(api_client.stream_completion(
+            messages=api_messages,
+            model=settings["model"],
+            temperature=settings["temperature"],
+            max_tokens=settings["max_tokens"],
+            cache=get_response_cache()
+        ), assistant_type)
+        
+        # Create assistant message - apply sanitization here
+        assistant_message = Message.assistant_message(sanitize_html_content(response_text))
+        conversation.add_message(assistant_message)
+        
+        # Save the conversation automatically every few turns
+        maybe_autosave_conversation()
+        return True
+    except Exception as e:
+        st.error(f"Error generating response: {str(e)}")
+        logger.error("Error in process_user_input: %s", e)
+        return False
+
+
+def show_earlier_messages():
+    """Widen the rendered window of the conversation by one page of messages."""
+    page = get_app_config()["render_window"]
+    st.session_state.render_window = (st.session_state.get("render_window") or page) + page
+
+
+def render_load_earlier_button(target, hidden: int) -> None:
+    """Draw the "Load earlier messages" button into a slot, or clear the slot.
+    
+    Args:
+        target: st.empty() slot to draw into
+        hidden: Number of messages outside the rendered window
+    """
+    if hidden > 0:
+        # Keyed by the count so the button can be redrawn within one run
+        target.button(f"Load earlier messages ({hidden} hidden)", key=f"load_earlier_btn_{hidden}",
+                      on_click=show_earlier_messages)
+    else:
+        target.empty()
+
+
+@st.fragment
+def render_chat_area(assistant_type=None):
+    """Render the conversation and chat input as an isolated fragment.
+    
+    A new turn is drawn in a live slot while it streams and then merged into
+    the history slot in place, so sending a message reruns neither the script
+    nor the fragment.
+    
+    Args:
+        assistant_type: Current assistant type (optional)
+    """
+    # Only the most recent messages are drawn; older ones load on demand
+    conversation = st.session_state.conversation
+    window = st.session_state.get("render_window") or get_app_config()["render_window"]
+    earlier_slot = st.empty()
+    render_load_earlier_button(earlier_slot, conversation.get_message_count() - window)
+    
+    # Display current conversation as a single element
+    history_slot = st.empty()
+    render_conversation(conversation, assistant_type, target=history_slot, max_messages=window)
+    
+    # Slot for the turn in progress, placed above the chat input
+    live_slot = st.empty()
+    
+    # Chat input
+    user_input = render_chat_input()
+    if user_input:
+        with live_slot.container():
+            completed = process_user_input(user_input, assistant_type)
+        
+        # Show the finished turn as part of the history; on failure keep the
+        # live slot so the error stays visible
+        if completed:
+            render_load_earlier_button(earlier_slot, conversation.get_message_count() - window)
+            render_conversation(conversation, assistant_type, target=history_slot, max_messages=window)
+            live_slot.empty()
 
 
 def run_app():
     """Run the Streamlit application."""
     logger.info("Starting application")
     
+    # Get app configuration
+    config = get_app_config()
+    
     # Set up page config
-    setup_page_config()
+    setup_page_config(config)
     
     # Initialize session state
     init_session_state()
-    
-    # Get app configuration
-    config = get_app_config()
+    ss = st.session_state
     
     # Apply base styles
     apply_theme()
@@ -301,37 +534,29 @@ def run_app():
     render_header(config["app_name"], config["version"])
     
     # Get current assistant type info
-    current_assistant_type = st.session_state.assistant_type
+    current_assistant_type = ss.assistant_type
     assistant_type = system_prompt_manager.get_assistant_type(current_assistant_type)
     
     # Show current assistant type
     if assistant_type:
-        st.markdown(f"""
-        <div style="display: flex; align-items: center; margin-bottom: 1.5rem; 
-                    padding: 1rem 1.5rem; background-color: white; 
-                    border-radius: 1rem; box-shadow: 0 1px 3px rgba(0,0,0,0.12), 0 1px 2px rgba(0,0,0,0.24);">
-            <div style="font-size: 2.5rem; margin-right: 1rem;">{assistant_type.icon}</div>
-            <div style="flex-grow: 1;">
-                <div style="font-weight: 600; font-size: 1.25rem; margin-bottom: 0.25rem; color: #333;">{assistant_type.name}</div>
-                <div style="font-size: 0.9rem; color: #666; line-height: 1.4;">{assistant_type.description}</div>
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
+        st.markdown(_assistant_card_html(assistant_type.id), unsafe_allow_html=True)
     
     # Render sidebar components and get updated settings
     settings = render_settings_sidebar(config["version"])
     
     # Check if assistant type has changed
-    if settings["assistant_type"] != st.session_state.assistant_type:
+    if settings["assistant_type"] != current_assistant_type:
         update_assistant_type(settings["assistant_type"])
+        assistant_type = system_prompt_manager.get_assistant_type(settings["assistant_type"])
     
     # Update settings in session state
-    st.session_state.settings = settings
+    ss.settings = settings
     
     # Show conversation management sidebar
+    conversation = ss.conversation
     render_conversation_sidebar(
-        st.session_state.history_manager,
-        getattr(st.session_state.conversation, "id", None),
+        ss.history_manager,
+        getattr(conversation, "id", None),
         on_new_conversation=create_new_conversation,
         on_load_conversation=load_conversation,
         on_rename_conversation=rename_conversation,
@@ -341,58 +566,12 @@ def run_app():
     # Render about section
     render_about_sidebar(config["version"], config["api_key"])
     
-        # Display current conversation
-    st.markdown("""
-    <style>
-        .block-container {
-            padding-top: 1rem;
-            padding-bottom: 0;
-            margin-top: 0;
-        }
-        
-        /* Fix for overlapping bar */
-        .main-content-container {
-            overflow: visible !important;
-        }
-        
-        /* Remove extra spacing between messages */
-        .stMarkdown {
-            margin-bottom: 0 !important;
-        }
-        
-        /* Ensure chat container is properly spaced */
-        .chat-container {
-            margin-bottom: 80px; /* Space for input box */
-        }
-    </style>
-    """, unsafe_allow_html=True)
-
-    # Create a container for all chat messages
-    chat_container = st.container()
-    with chat_container:
-        st.markdown('<div class="chat-container">', unsafe_allow_html=True)
-        # Display current conversation
-        for message in st.session_state.conversation.messages:
-            render_message(message, assistant_type)
-        st.markdown('</div>', unsafe_allow_html=True)
-    
-    # Chat input
-    user_input = render_chat_input()
-    if user_input:
-        process_user_input(user_input)
-    
+    # Layout fixes for the conversation area
+    apply_static_css("chat.css")
+
+    # Conversation and chat input
+    render_chat_area(assistant_type)
     
     # Additional information
     with st.expander("About this application"):
-        st.markdown("""
-        This is a Streamlit-based chat application that uses OpenAI's API to generate responses.
-        
-        Features:
-        - Chat with various OpenAI models
-        - Choose different assistant types with specialized expertise
-        - Adjust model parameters like temperature and max tokens
-        - Save and load conversations
-        - Create multiple conversation threads
-        
-        To use this application, make sure you have an OpenAI API key in your .env file.
-        """)
\ No newline at end of file
+        st.markdown(_ABOUT_TEXT)
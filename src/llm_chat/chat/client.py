@@ -1,41 +1,238 @@
 """OpenAI client module for managing API interactions."""
+import asyncio
+import hashlib
 import logging
 import os
-from typing import List, Dict, Any, Optional
+import threading
+import time
+from typing import List, Dict, Any, AsyncIterator, Iterable, Iterator, Optional
+import numpy as np
 import openai
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
 # Set up logging
 logger = logging.getLogger(__name__)
 
 # Monkey patch to fix proxies issue
 def apply_openai_patches():
-    """Apply monkey patches to OpenAI client to fix known issues."""
-    # Fix for proxies parameter issue
-    original_init = openai._base_client.SyncHttpxClientWrapper.__init__
-    
-    def patched_init(self, *args, **kwargs):
-        # Remove the proxies parameter if it exists
-        if 'proxies' in kwargs:
-            del kwargs['proxies']
-        original_init(self, *args, **kwargs)
-    
-    # Apply the patch
-    openai._base_client.SyncHttpxClientWrapper.__init__ = patched_init
-    logger.info("Applied OpenAI client patches")
+    """Apply monkey patches to OpenAI client to fix known issues.
+    
+    Each patched ``__init__`` is marked, so calling this again (including
+    after Streamlit re-imports the module) never wraps it a second time.
+    """
+    patched_any = False
+    
+    # Fix for proxies parameter issue (sync and async HTTP clients)
+    for wrapper in (openai._base_client.SyncHttpxClientWrapper,
+                    openai._base_client.AsyncHttpxClientWrapper):
+        original_init = wrapper.__init__
+        if getattr(original_init, "_proxies_patched", False):
+            continue
+        
+        def patched_init(self, *args, _original_init=original_init, **kwargs):
+            # Remove the proxies parameter if it exists
+            if 'proxies' in kwargs:
+                del kwargs['proxies']
+            _original_init(self, *args, **kwargs)
+        
+        # Apply the patch
+        patched_init._proxies_patched = True
+        wrapper.__init__ = patched_init
+        patched_any = True
+    
+    if patched_any:
+        logger.info("Applied OpenAI client patches")
+
+
+apply_openai_patches()
+
+
+class SemanticCache:
+    """In-process cache of completions keyed by prompt similarity.
+    
+    Exact repeats are answered from a dict lookup; paraphrased prompts are
+    matched by cosine similarity of their (normalized) embeddings. Entries
+    are kept in a fixed-size ring, so once ``max_entries`` is reached each
+    new entry evicts the oldest one. All methods are safe to call from
+    several threads.
+    
+    Only completions sampled at temperature 0 are cached unless
+    ``any_temperature`` is set: at other temperatures a repeated prompt is
+    expected to get a fresh answer, so serving one requires an explicit opt-in.
+    """
+    
+    def __init__(self,
+                 threshold: float = 0.92,
+                 max_entries: int = 1024,
+                 any_temperature: bool = False):
+        """Initialize the cache.
+        
+        Args:
+            threshold: Minimum cosine similarity for a semantic hit
+            max_entries: Maximum number of cached responses
+            any_temperature: Also cache completions sampled at temperature > 0
+        """
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.any_temperature = any_temperature
+        self._lock = threading.Lock()
+        # Exact key -> slot in the ring below
+        self._exact: Dict[str, int] = {}
+        self._keys: List[str] = []
+        self._contexts: List[str] = []
+        self._responses: List[str] = []
+        # Preallocated (max_entries, dim) matrix; rows past len(self) are unused
+        self._matrix: Optional[np.ndarray] = None
+        # Slot overwritten by the next add once the ring is full (the oldest)
+        self._next = 0
+    
+    @staticmethod
+    def make_key(*parts: Optional[str]) -> str:
+        """Build a stable hash key from the given string parts."""
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update((part or "").encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+    
+    def __len__(self) -> int:
+        return len(self._responses)
+    
+    def get_exact(self, key: str) -> Optional[str]:
+        """Return the cached response for an exact key match, if any."""
+        with self._lock:
+            slot = self._exact.get(key)
+            return self._responses[slot] if slot is not None else None
+    
+    def get_similar(self, context: str, embedding: List[float]) -> Optional[str]:
+        """Return the cached response most similar to ``embedding``.
+        
+        Args:
+            context: Context key the entry must share (see ChatClient._cache_lookup)
+            embedding: Embedding of the prompt being looked up
+            
+        Returns:
+            The cached response or None if nothing is above the threshold
+        """
+        query = self._normalize(embedding)
+        with self._lock:
+            if self._matrix is None or query.shape[0] != self._matrix.shape[1]:
+                return None
+            candidates = [slot for slot, c in enumerate(self._contexts) if c == context]
+            if not candidates:
+                return None
+            scores = self._matrix[candidates] @ query
+            best = int(np.argmax(scores))
+            if scores[best] > self.threshold:
+                return self._responses[candidates[best]]
+        return None
+    
+    def add(self, key: str, context: str, embedding: List[float], response: str) -> None:
+        """Add a response to the cache, evicting the oldest entry if it is full.
+        
+        Args:
+            key: Exact-match key for the prompt
+            context: Context key the prompt was looked up under
+            embedding: Embedding of the prompt
+            response: Completion to cache
+        """
+        vector = self._normalize(embedding)
+        with self._lock:
+            if self._matrix is None or self._matrix.shape[1] != vector.shape[0]:
+                self._matrix = np.zeros((self.max_entries, vector.shape[0]), dtype=np.float32)
+                self._exact.clear()
+                self._keys, self._contexts, self._responses = [], [], []
+                self._next = 0
+            
+            slot = self._exact.get(key)
+            if slot is None:
+                if len(self._responses) < self.max_entries:
+                    slot = len(self._responses)
+                    self._keys.append(key)
+                    self._contexts.append(context)
+                    self._responses.append(response)
+                else:
+                    slot = self._next
+                    self._next = (slot + 1) % self.max_entries
+                    del self._exact[self._keys[slot]]
+            
+            self._matrix[slot] = vector
+            self._keys[slot] = key
+            self._contexts[slot] = context
+            self._responses[slot] = response
+            self._exact[key] = slot
+    
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class StreamBuffer:
+    """Coalesce a stream of small text pieces into fewer, larger chunks.
+    
+    The first piece is passed through immediately. After that, pieces are
+    buffered and flushed once ``max_chars`` characters have accumulated or
+    ``min_interval`` seconds have passed since the last flush, which caps how
+    often the UI has to redraw while a reply streams in.
+    """
+    
+    __slots__ = ("chunks", "max_chars", "min_interval")
+    
+    def __init__(self, chunks: Iterable[str], max_chars: int = 64, min_interval: float = 0.05):
+        """Initialize the buffer.
+        
+        Args:
+            chunks: Iterable of text pieces to coalesce
+            max_chars: Flush once this many characters are buffered
+            min_interval: Flush once this many seconds have passed since the last flush
+        """
+        self.chunks = chunks
+        self.max_chars = max_chars
+        self.min_interval = min_interval
+    
+    def __iter__(self) -> Iterator[str]:
+        pending: List[str] = []
+        pending_chars = 0
+        # Never hold back the first piece, so time to first token is not delayed
+        last_flush = float("-inf")
+        
+        for chunk in self.chunks:
+            pending.append(chunk)
+            pending_chars += len(chunk)
+            
+            now = time.monotonic()
+            if pending_chars >= self.max_chars or now - last_flush >= self.min_interval:
+                yield "".join(pending)
+                pending.clear()
+                pending_chars = 0
+                last_flush = now
+        
+        if pending:
+            yield "".join(pending)
 
 
 class ChatClient:
     """Client for interacting with OpenAI's API."""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self,
+                 api_key: Optional[str] = None,
+                 cache: Optional[SemanticCache] = None,
+                 embedding_model: str = "text-embedding-3-small"):
         """Initialize the OpenAI client.
         
         Args:
             api_key: OpenAI API key (defaults to environment variable)
+            cache: Optional semantic response cache consulted before the API
+                on every call (callers can also pass one per call instead)
+            embedding_model: Embedding model used for semantic cache lookups
         """
-        # Apply patches for OpenAI client
-        apply_openai_patches()
+        self.cache = cache
+        self.embedding_model = embedding_model
+        # Event loop thread for the synchronous wrappers, started on first use
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
         
         # Use provided API key or get from environment
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
@@ -43,15 +240,18 @@ class ChatClient:
         if not self.api_key:
             logger.warning("No OpenAI API key provided")
             self.client = None
+            self.aclient = None
         else:
             self.client = OpenAI(api_key=self.api_key)
+            self.aclient = AsyncOpenAI(api_key=self.api_key)
             logger.info("Initialized OpenAI client")
     
     def get_completion(self, 
                       messages: List[Dict[str, str]], 
                       model: str = "gpt-3.5-turbo",
                       temperature: float = 0.7,
-                      max_tokens: int = 1024) -> Optional[str]:
+                      max_tokens: int = 1024,
+                      cache: Optional[SemanticCache] = None) -> Optional[str]:
         """Get a completion from the OpenAI API.
         
         Args:
@@ -59,6 +259,7 @@ class ChatClient:
             model: OpenAI model to use
             temperature: Temperature parameter (0-1)
             max_tokens: Maximum tokens to generate
+            cache: Response cache for this call (defaults to the client's cache)
             
         Returns:
             The response text or None if error
@@ -67,6 +268,12 @@ class ChatClient:
             logger.error("Cannot get completion: OpenAI client not initialized")
             return "Error: OpenAI API client not initialized. Please check your API key."
         
+        # Look the prompt up in the response cache before calling the API
+        cache = cache if cache is not None else self.cache
+        cache_entry = self._cache_lookup(cache, messages, model, temperature, max_tokens)
+        if cache_entry and cache_entry[0] is not None:
+            return cache_entry[0]
+        
         try:
             response = self.client.chat.completions.create(
                 model=model,
@@ -74,12 +281,268 @@ class ChatClient:
                 temperature=temperature,
                 max_tokens=max_tokens
             )
+            content = response.choices[0].message.content
+        except Exception as e:
+            error_msg = f"Error calling OpenAI API: {str(e)}"
+            logger.error(error_msg)
+            return f"Error: {str(e)}"
+        
+        if cache_entry and content:
+            _, key, context, embedding = cache_entry
+            cache.add(key, context, embedding, content)
+        return content
+    
+    def stream_completion(self,
+                          messages: List[Dict[str, str]],
+                          model: str = "gpt-3.5-turbo",
+                          temperature: float = 0.7,
+                          max_tokens: int = 1024,
+                          min_interval: float = 0.05,
+                          max_chars: int = 64,
+                          cache: Optional[SemanticCache] = None) -> Iterator[str]:
+        """Stream a completion from the OpenAI API.
+        
+        Pieces are coalesced through a :class:`StreamBuffer`, so the first
+        token is yielded as soon as it arrives and later ones at most every
+        ``min_interval`` seconds (or once ``max_chars`` characters are buffered).
+        
+        Args:
+            messages: List of message dictionaries
+            model: OpenAI model to use
+            temperature: Temperature parameter (0-1)
+            max_tokens: Maximum tokens to generate
+            min_interval: Minimum number of seconds between yielded chunks
+            max_chars: Number of buffered characters that forces a chunk out early
+            cache: Response cache for this call (defaults to the client's cache)
+            
+        Yields:
+            Pieces of the response text
+        """
+        if not self.client:
+            logger.error("Cannot get completion: OpenAI client not initialized")
+            yield "Error: OpenAI API client not initialized. Please check your API key."
+            return
+        
+        # Serve cached responses in one piece
+        cache = cache if cache is not None else self.cache
+        cache_entry = self._cache_lookup(cache, messages, model, temperature, max_tokens)
+        if cache_entry and cache_entry[0] is not None:
+            yield cache_entry[0]
+            return
+        
+        parts: List[str] = []
+        
+        def deltas(stream) -> Iterator[str]:
+            for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+                    yield parts[-1]
+        
+        try:
+            stream = self.client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True
+            )
+            yield from StreamBuffer(deltas(stream), max_chars=max_chars, min_interval=min_interval)
+        except Exception as e:
+            error_msg = f"Error calling OpenAI API: {str(e)}"
+            logger.error(error_msg)
+            yield f"Error: {str(e)}"
+            return
+        
+        content = "".join(parts)
+        if cache_entry and content:
+            _, key, context, embedding = cache_entry
+            cache.add(key, context, embedding, content)
+    
+    def _cache_lookup(self,
+                      cache: Optional[SemanticCache],
+                      messages: List[Dict[str, str]],
+                      model: str,
+                      temperature: float,
+                      max_tokens: int):
+        """Look up a completion for ``messages`` in a semantic cache.
+        
+        Exact hits require the same model, sampling parameters and full
+        message list. Similarity hits compare the last user message against
+        entries sharing the model, sampling parameters and every earlier
+        message (system prompt included), so a follow-up such as "tell me
+        more" only matches within the same conversation so far.
+        
+        Caching is skipped unless ``temperature`` is 0 or the cache was
+        created with ``any_temperature``.
+        
+        Returns:
+            None if caching is not possible (no embedding request is made),
+            otherwise a tuple of (cached response or None, key, context, embedding)
+        """
+        if cache is None or (temperature != 0 and not cache.any_temperature):
+            return None
+        
+        last_user_idx = next((i for i in range(len(messages) - 1, -1, -1)
+                              if messages[i]["role"] == "user"), None)
+        if last_user_idx is None or not messages[last_user_idx]["content"]:
+            return None
+        last_user = messages[last_user_idx]["content"]
+        
+        params = (model, repr(temperature), repr(max_tokens))
+        context = SemanticCache.make_key(
+            *params, *(part for m in messages[:last_user_idx] for part in (m["role"], m["content"]))
+        )
+        key = SemanticCache.make_key(*params, *(part for m in messages for part in (m["role"], m["content"])))
+        cached = cache.get_exact(key)
+        if cached is not None:
+            logger.info("Semantic cache exact hit")
+            return cached, key, context, None
+        
+        try:
+            result = self.client.embeddings.create(model=self.embedding_model, input=last_user)
+            embedding = result.data[0].embedding
+        except Exception as e:
+            logger.error(f"Error creating embedding for cache lookup: {e}")
+            return None
+        
+        cached = cache.get_similar(context, embedding)
+        if cached is not None:
+            logger.info("Semantic cache similarity hit")
+        return cached, key, context, embedding
+    
+    async def aget_completion(self, 
+                              messages: List[Dict[str, str]], 
+                              model: str = "gpt-3.5-turbo",
+                              temperature: float = 0.7,
+                              max_tokens: int = 1024) -> Optional[str]:
+        """Get a completion from the OpenAI API without blocking the event loop.
+        
+        Args:
+            messages: List of message dictionaries
+            model: OpenAI model to use
+            temperature: Temperature parameter (0-1)
+            max_tokens: Maximum tokens to generate
+            
+        Returns:
+            The response text or None if error
+        """
+        if not self.aclient:
+            logger.error("Cannot get completion: OpenAI client not initialized")
+            return "Error: OpenAI API client not initialized. Please check your API key."
+        
+        try:
+            response = await self.aclient.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
             return response.choices[0].message.content
         except Exception as e:
             error_msg = f"Error calling OpenAI API: {str(e)}"
             logger.error(error_msg)
             return f"Error: {str(e)}"
     
+    async def astream_completion(self,
+                                 messages: List[Dict[str, str]],
+                                 model: str = "gpt-3.5-turbo",
+                                 temperature: float = 0.7,
+                                 max_tokens: int = 1024) -> AsyncIterator[str]:
+        """Stream a completion from the OpenAI API without blocking the event loop.
+        
+        Args:
+            messages: List of message dictionaries
+            model: OpenAI model to use
+            temperature: Temperature parameter (0-1)
+            max_tokens: Maximum tokens to generate
+            
+        Yields:
+            Pieces of the response text as they arrive
+        """
+        if not self.aclient:
+            logger.error("Cannot get completion: OpenAI client not initialized")
+            yield "Error: OpenAI API client not initialized. Please check your API key."
+            return
+        
+        try:
+            stream = await self.aclient.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                stream=True
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            error_msg = f"Error calling OpenAI API: {str(e)}"
+            logger.error(error_msg)
+            yield f"Error: {str(e)}"
+    
+    async def aget_completions_batch(self,
+                                     requests: List[List[Dict[str, str]]],
+                                     model: str = "gpt-3.5-turbo",
+                                     temperature: float = 0.7,
+                                     max_tokens: int = 1024,
+                                     max_concurrency: int = 8) -> List[Optional[str]]:
+        """Get completions for several message lists concurrently.
+        
+        Args:
+            requests: List of message lists, one per completion
+            model: OpenAI model to use
+            temperature: Temperature parameter (0-1)
+            max_tokens: Maximum tokens to generate
+            max_concurrency: Maximum number of requests in flight at once
+            
+        Returns:
+            List of response texts in the same order as ``requests``
+        """
+        sem = asyncio.Semaphore(max_concurrency)
+        
+        async def _limited(messages: List[Dict[str, str]]) -> Optional[str]:
+            async with sem:
+                return await self.aget_completion(
+                    messages,
+                    model=model,
+                    temperature=temperature,
+                    max_tokens=max_tokens
+                )
+        
+        results = await asyncio.gather(
+            *(_limited(messages) for messages in requests),
+            return_exceptions=True
+        )
+        return [f"Error: {str(r)}" if isinstance(r, Exception) else r for r in results]
+    
+    def get_completions_batch(self,
+                              requests: List[List[Dict[str, str]]],
+                              **kwargs: Any) -> List[Optional[str]]:
+        """Synchronous wrapper around :meth:`aget_completions_batch`.
+        
+        Args:
+            requests: List of message lists, one per completion
+            **kwargs: Forwarded to :meth:`aget_completions_batch`
+            
+        Returns:
+            List of response texts in the same order as ``requests``
+        """
+        return self._run_async(self.aget_completions_batch(requests, **kwargs))
+    
+    def _run_async(self, coro):
+        """Run a coroutine to completion on the client's event loop thread.
+        
+        The async OpenAI client's pooled connections belong to the loop they
+        were opened on, so a shared client runs every call on one long-lived
+        loop rather than a fresh asyncio.run loop each time.
+        """
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, daemon=True,
+                                 name="chat-client-loop").start()
+        return asyncio.run_coroutine_threadsafe(coro, self._loop).result()
+    
     def is_available(self) -> bool:
         """Check if the client is available and properly initialized."""
         return self.client is not None
\ No newline at end of file
@@ -2,10 +2,13 @@
 import os
 import json
 import logging
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 
+from ..utils.helpers import format_date_for_display
+
 logger = logging.getLogger(__name__)
 
 class ChatHistoryManager:
@@ -25,10 +28,23 @@ class ChatHistoryManager:
         self.storage_dir = Path(storage_dir)
         self._ensure_storage_dir()
         
-        # Cache for conversation metadata
+        # Sidecar index of conversation metadata, so listing does not parse
+        # every conversation file; the lock serializes its read-modify-write
+        # between background saves and the script thread
+        self.index_path = self.storage_dir / "index.json"
+        self._index_lock = threading.Lock()
+        
+        # Cache for conversation metadata, and a counter bumped on every write
+        # so a listing that raced with a write is not cached
         self._conversations_cache = None
+        self._revision = 0
         logger.info(f"Initialized ChatHistoryManager with storage at {self.storage_dir}")
     
+    def _invalidate_cache(self) -> None:
+        """Drop the cached conversation listing after a write."""
+        self._revision += 1
+        self._conversations_cache = None
+    
     def _ensure_storage_dir(self) -> None:
         """Ensure the storage directory exists."""
         os.makedirs(self.storage_dir, exist_ok=True)
@@ -37,6 +53,88 @@ class ChatHistoryManager:
         """Get the file path for a conversation."""
         return self.storage_dir / f"{conversation_id}.json"
     
+    def generate_conversation_id(self) -> str:
+        """Generate an ID for a new conversation based on the current time.
+        
+        Microseconds are included so conversations created within the same
+        second do not overwrite each other; IDs still sort chronologically.
+        """
+        return datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    
+    def _write_json_file(self, file_path: Path, data: Any) -> None:
+        """Atomically write JSON data to disk.
+        
+        The data is written to a temporary file which then replaces the
+        target, so readers never see a partially written file.
+        """
+        tmp_path = file_path.with_name(f"{file_path.name}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, file_path)
+    
+    def _write_conversation_file(self, conversation_id: str, data: Dict[str, Any]) -> None:
+        """Atomically write conversation data to disk."""
+        self._write_json_file(self.get_conversation_path(conversation_id), data)
+    
+    @staticmethod
+    def _conversation_meta(data: Dict[str, Any], conversation_id: str) -> Dict[str, Any]:
+        """Extract listing metadata from conversation data, excluding messages."""
+        updated = data.get("updated", "")
+        return {
+            "id": data.get("id", conversation_id),
+            "title": data.get("title", "Unnamed Conversation"),
+            "created": data.get("created", ""),
+            "updated": updated,
+            # Formatted once here so the cached listing renders as-is
+            "updated_display": format_date_for_display(updated),
+            "message_count": len(data.get("messages", [])),
+        }
+    
+    def _read_index(self) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Read the metadata index, or None if it is missing or unreadable."""
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return index if isinstance(index, dict) else None
+    
+    def _conversation_ids(self) -> List[str]:
+        """List the IDs of the conversation files in the storage directory.
+        
+        Uses os.scandir, which yields plain names without building a Path
+        or stat-ing each file.
+        """
+        index_name = self.index_path.name
+        with os.scandir(self.storage_dir) as entries:
+            return [entry.name[:-5] for entry in entries
+                    if entry.name.endswith(".json") and entry.name != index_name]
+    
+    def _scan_conversations(self) -> Dict[str, Dict[str, Any]]:
+        """Build the metadata index by parsing every conversation file."""
+        index = {}
+        for conversation_id in self._conversation_ids():
+            file_path = self.get_conversation_path(conversation_id)
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                index[conversation_id] = self._conversation_meta(data, conversation_id)
+            except Exception as e:
+                logger.error(f"Error loading conversation from {file_path}: {e}")
+        return index
+    
+    def _update_index(self, conversation_id: str, meta: Optional[Dict[str, Any]]) -> None:
+        """Set or, when meta is None, remove one entry of the metadata index."""
+        with self._index_lock:
+            index = self._read_index()
+            if index is None:
+                index = self._scan_conversations()
+            if meta is None:
+                index.pop(conversation_id, None)
+            else:
+                index[conversation_id] = meta
+            self._write_json_file(self.index_path, index)
+    
     def save_conversation(self, 
                           messages: List[Dict[str, Any]], 
                           conversation_id: Optional[str] = None,
@@ -55,7 +153,7 @@ class ChatHistoryManager:
         """
         # If no ID provided, create a new one based on timestamp
         if not conversation_id:
-            conversation_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+            conversation_id = self.generate_conversation_id()
         
         # If no title provided, generate one from the first few messages
         if not title and messages:
@@ -64,29 +162,29 @@ class ChatHistoryManager:
             if first_user_msg:
                 # Take first few words of first user message
                 content = first_user_msg["content"]
-                title = " ".join(content.split()[:5])
-                if len(content.split()) > 5:
+                words = content.split(None, 5)
+                title = " ".join(words[:5])
+                if len(words) > 5:
                     title += "..."
             else:
                 title = f"Conversation {conversation_id}"
         
         # Add metadata
+        now = datetime.now().isoformat()
         conversation_data = {
             "id": conversation_id,
             "title": title,
             "system_prompt": system_prompt,
-            "created": datetime.now().isoformat(),
-            "updated": datetime.now().isoformat(),
+            "created": now,
+            "updated": now,
             "messages": messages
         }
         
         # Save to file
-        file_path = self.get_conversation_path(conversation_id)
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(conversation_data, f, indent=2, ensure_ascii=False)
+        self._write_conversation_file(conversation_id, conversation_data)
+        self._update_index(conversation_id, self._conversation_meta(conversation_data, conversation_id))
         
-        # Invalidate cache
-        self._conversations_cache = None
+        self._invalidate_cache()
         
         logger.info(f"Saved conversation {conversation_id} with {len(messages)} messages")
         return conversation_id
@@ -104,11 +202,11 @@ class ChatHistoryManager:
             FileNotFoundError: If the conversation doesn't exist
         """
         file_path = self.get_conversation_path(conversation_id)
-        if not file_path.exists():
-            raise FileNotFoundError(f"Conversation {conversation_id} not found")
-        
-        with open(file_path, 'r', encoding='utf-8') as f:
-            conversation_data = json.load(f)
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                conversation_data = json.load(f)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Conversation {conversation_id} not found") from None
         
         logger.info(f"Loaded conversation {conversation_id} with {len(conversation_data['messages'])} messages")
         return conversation_data
@@ -122,13 +220,13 @@ class ChatHistoryManager:
         Returns:
             bool: True if deleted, False if not found
         """
-        file_path = self.get_conversation_path(conversation_id)
-        if not file_path.exists():
+        try:
+            os.remove(self.get_conversation_path(conversation_id))
+        except FileNotFoundError:
             return False
         
-        os.remove(file_path)
-        # Invalidate cache
-        self._conversations_cache = None
+        self._update_index(conversation_id, None)
+        self._invalidate_cache()
         
         logger.info(f"Deleted conversation {conversation_id}")
         return True
@@ -146,31 +244,24 @@ class ChatHistoryManager:
         if self._conversations_cache is not None and not force_refresh:
             return self._conversations_cache
         
-        conversations = []
+        revision = self._revision
         
-        # Find all JSON files in the storage directory
-        for file_path in self.storage_dir.glob("*.json"):
-            try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                
-                # Extract metadata, excluding full messages
-                conversation_meta = {
-                    "id": data.get("id", file_path.stem),
-                    "title": data.get("title", "Unnamed Conversation"),
-                    "created": data.get("created", ""),
-                    "updated": data.get("updated", ""),
-                    "message_count": len(data.get("messages", [])),
-                }
-                conversations.append(conversation_meta)
-            except Exception as e:
-                logger.error(f"Error loading conversation from {file_path}: {e}")
+        # Read the index, rebuilding it when it is missing or does not match
+        # the conversation files on disk (e.g. files added by hand)
+        with self._index_lock:
+            conversation_ids = set(self._conversation_ids())
+            index = self._read_index()
+            if index is None or index.keys() != conversation_ids:
+                index = self._scan_conversations()
+                self._write_json_file(self.index_path, index)
+        conversations = list(index.values())
         
         # Sort by creation date, newest first
         conversations.sort(key=lambda x: x["created"], reverse=True)
         
-        # Update cache
-        self._conversations_cache = conversations
+        # Update cache unless a write happened while scanning
+        if self._revision == revision:
+            self._conversations_cache = conversations
         
         return conversations
     
@@ -189,12 +280,10 @@ class ChatHistoryManager:
             conversation["title"] = new_title
             conversation["updated"] = datetime.now().isoformat()
             
-            file_path = self.get_conversation_path(conversation_id)
-            with open(file_path, 'w', encoding='utf-8') as f:
-                json.dump(conversation, f, indent=2, ensure_ascii=False)
+            self._write_conversation_file(conversation_id, conversation)
+            self._update_index(conversation_id, self._conversation_meta(conversation, conversation_id))
             
-            # Invalidate cache
-            self._conversations_cache = None
+            self._invalidate_cache()
             
             logger.info(f"Renamed conversation {conversation_id} to '{new_title}'")
             return True
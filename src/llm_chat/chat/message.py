@@ -1,37 +1,73 @@
 """Message handling for chat interactions."""
+import sys
+import time
+from collections.abc import Sequence
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional
 
+# Interned role names; roles loaded from JSON are interned on construction so
+# comparisons against these hit the identity fast path of str equality
+ROLE_USER = sys.intern("user")
+ROLE_ASSISTANT = sys.intern("assistant")
+ROLE_SYSTEM = sys.intern("system")
 
+# Fields stored directly on Message; any other key is metadata
+_MESSAGE_STANDARD_FIELDS = frozenset(("role", "content", "timestamp"))
+
+# Last formatted wall-clock second, reused by messages created within it
+_clock_cache = (-1, "")
+
+
+def _current_time_str() -> str:
+    """Get the current local time as HH:MM:SS, formatting at most once per second."""
+    global _clock_cache
+    now = int(time.time())
+    if _clock_cache[0] != now:
+        _clock_cache = (now, time.strftime("%H:%M:%S", time.localtime(now)))
+    return _clock_cache[1]
+
+
+@dataclass(slots=True, eq=False)
 class Message:
-    """Represents a chat message with role, content and metadata."""
+    """Represents a chat message with role, content and metadata.
     
-    def __init__(self, 
-                 role: str, 
-                 content: str, 
-                 timestamp: Optional[str] = None,
-                 metadata: Optional[Dict[str, Any]] = None):
-        """Initialize a chat message.
+    Attributes:
+        role: Role of the message sender (user, assistant, system)
+        content: Text content of the message
+        timestamp: Timestamp of the message (defaults to now)
+        metadata: Additional metadata for the message
+    """
+    
+    role: str
+    content: str
+    timestamp: Optional[str] = None
+    metadata: Optional[Dict[str, Any]] = None
+    _api_dict: Optional[Dict[str, str]] = field(default=None, init=False, repr=False)
+    
+    def __post_init__(self) -> None:
+        self.role = sys.intern(self.role)
+        if not self.timestamp:
+            self.timestamp = _current_time_str()
+        if not self.metadata:
+            self.metadata = {}
+    
+    def to_api_dict(self) -> Dict[str, str]:
+        """Get the message in the format used by the API (role and content only).
         
-        Args:
-            role: Role of the message sender (user, assistant, system)
-            content: Text content of the message
-            timestamp: Timestamp of the message (defaults to now)
-            metadata: Additional metadata for the message
+        The dictionary is built once and reused while role and content are unchanged.
         """
-        self.role = role
-        self.content = content
-        self.timestamp = timestamp or datetime.now().strftime("%H:%M:%S")
-        self.metadata = metadata or {}
+        api_dict = self._api_dict
+        if api_dict is None or api_dict["role"] is not self.role or api_dict["content"] is not self.content:
+            api_dict = self._api_dict = {"role": self.role, "content": self.content}
+        return api_dict
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert message to dictionary representation."""
-        return {
-            "role": self.role,
-            "content": self.content,
-            "timestamp": self.timestamp,
-            **self.metadata
-        }
+        data = {"role": self.role, "content": self.content, "timestamp": self.timestamp}
+        if self.metadata:
+            data.update(self.metadata)
+        return data
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Message':
@@ -40,9 +76,14 @@ class Message:
         content = data.get("content", "")
         timestamp = data.get("timestamp", None)
         
-        # Extract metadata (all fields except standard ones)
-        standard_fields = {"role", "content", "timestamp"}
-        metadata = {k: v for k, v in data.items() if k not in standard_fields}
+        # Extract metadata (all fields except standard ones), skipping the
+        # copy entirely when only standard fields are present
+        metadata = None
+        standard_count = ("role" in data) + ("content" in data) + ("timestamp" in data)
+        if len(data) > standard_count:
+            metadata = data.copy()
+            for field_name in _MESSAGE_STANDARD_FIELDS:
+                metadata.pop(field_name, None)
         
         return cls(role, content, timestamp, metadata)
     
@@ -50,22 +91,53 @@ class Message:
     def user_message(cls, content: str) -> 'Message':
         """Create a user message."""
         # Ensure content is treated as plain text, not HTML
-        return cls("user", content)
+        return cls(ROLE_USER, content)
 
     @classmethod
     def assistant_message(cls, content: str) -> 'Message':
         """Create an assistant message."""
         # Ensure content is treated as plain text, not HTML
-        return cls("assistant", content)
+        return cls(ROLE_ASSISTANT, content)
     
     @classmethod
     def system_message(cls, content: str) -> 'Message':
         """Create a system message."""
-        return cls("system", content)
+        return cls(ROLE_SYSTEM, content)
+
+
+class MessageView(Sequence):
+    """Read-only view over a conversation's message list (no copy)."""
+    
+    __slots__ = ("_items",)
+    
+    def __init__(self, items: List[Message]):
+        self._items = items
+    
+    def __getitem__(self, index):
+        return self._items[index]
+    
+    def __len__(self) -> int:
+        return len(self._items)
+    
+    def __iter__(self) -> Iterator[Message]:
+        return iter(self._items)
+    
+    def __reversed__(self) -> Iterator[Message]:
+        return reversed(self._items)
+    
+    def __repr__(self) -> str:
+        return f"MessageView({self._items!r})"
 
 
 class Conversation:
-    """Represents a chat conversation with multiple messages."""
+    """Represents a chat conversation with multiple messages.
+    
+    Messages are added through add_message, which keeps the derived
+    indexes (API messages, last user message) up to date.
+    """
+    
+    __slots__ = ("_messages", "id", "title", "system_prompt", "created_at",
+                 "_updated_ts", "_updated_iso", "_api_messages", "_last_user_idx")
     
     def __init__(self, 
                  messages: Optional[List[Message]] = None,
@@ -80,17 +152,47 @@ class Conversation:
             title: Title of the conversation
             system_prompt: System prompt for the conversation
         """
-        self.messages = messages or []
+        self._messages: List[Message] = list(messages) if messages else []
         self.id = id
         self.title = title
         self.system_prompt = system_prompt
         self.created_at = datetime.now().isoformat()
-        self.updated_at = self.created_at
+        # Last update as a raw timestamp; formatted to ISO only when read
+        self._updated_ts: Optional[float] = None
+        self._updated_iso: Optional[str] = self.created_at
+        # API-formatted messages, extended by add_message
+        self._api_messages: Optional[List[Dict[str, str]]] = None
+        # Index of the most recent user message, -1 if there is none
+        self._last_user_idx = -1
+        for i, message in enumerate(self._messages):
+            if message.role == ROLE_USER:
+                self._last_user_idx = i
+    
+    @property
+    def messages(self) -> MessageView:
+        """Read-only view of the messages in the conversation."""
+        return MessageView(self._messages)
     
     def add_message(self, message: Message) -> None:
         """Add a message to the conversation."""
-        self.messages.append(message)
-        self.updated_at = datetime.now().isoformat()
+        self._messages.append(message)
+        if message.role == ROLE_USER:
+            self._last_user_idx = len(self._messages) - 1
+        if self._api_messages is not None:
+            self._api_messages.append(message.to_api_dict())
+        self._updated_ts = time.time()
+        self._updated_iso = None
+    
+    @property
+    def updated_at(self) -> str:
+        """ISO timestamp of the last update."""
+        if self._updated_iso is None:
+            self._updated_iso = datetime.fromtimestamp(self._updated_ts).isoformat()
+        return self._updated_iso
+    
+    @updated_at.setter
+    def updated_at(self, value: str) -> None:
+        self._updated_iso = value
     
     def set_system_prompt(self, system_prompt: str) -> None:
         """Set the system prompt for this conversation.
@@ -99,6 +201,7 @@ class Conversation:
             system_prompt: The system prompt text
         """
         self.system_prompt = system_prompt
+        self._api_messages = None
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert conversation to dictionary representation."""
@@ -108,7 +211,7 @@ class Conversation:
             "system_prompt": self.system_prompt,
             "created": self.created_at,
             "updated": self.updated_at,
-            "messages": [m.to_dict() for m in self.messages]
+            "messages": [m.to_dict() for m in self._messages]
         }
     
     @classmethod
@@ -131,28 +234,49 @@ class Conversation:
         
         return conversation
     
-    def get_api_messages(self) -> List[Dict[str, str]]:
+    def get_api_messages(self, max_messages: Optional[int] = None) -> List[Dict[str, str]]:
         """Get messages in format suitable for API calls (without metadata).
         
-        This includes the system prompt as a system message if present.
+        This includes the system prompt as a system message if present. The
+        formatted list is cached and extended as messages are added, so only
+        new messages are converted on each call.
+        
+        Args:
+            max_messages: Only include the most recent N conversation messages
+                (the system prompt is always kept). The window is shrunk to
+                start at a user message, so it never opens mid-turn with an
+                orphaned reply. None includes all messages.
         """
-        # Start with system prompt if available
-        api_messages = []
-        if self.system_prompt:
-            api_messages.append({"role": "system", "content": self.system_prompt})
+        api_messages = self._api_messages
+        offset = 1 if self.system_prompt else 0
+        
+        # Rebuild if the system prompt was reassigned since the cache was built
+        if (api_messages is None
+                or len(api_messages) != len(self._messages) + offset
+                or (offset and api_messages[0]["content"] is not self.system_prompt)):
+            api_messages = []
+            if self.system_prompt:
+                api_messages.append({"role": ROLE_SYSTEM, "content": self.system_prompt})
+            api_messages.extend([m.to_api_dict() for m in self._messages])
+            self._api_messages = api_messages
         
-        # Add conversation messages
-        api_messages.extend([{"role": m.role, "content": m.content} for m in self.messages])
+        # Keep the system prompt plus the most recent window of messages
+        if max_messages is not None and len(api_messages) - offset > max_messages:
+            end = len(api_messages)
+            start = end - max(max_messages, 0)
+            while start < end and api_messages[start]["role"] != ROLE_USER:
+                start += 1
+            return api_messages[:offset] + api_messages[start:]
         
-        return api_messages
+        # Return a copy so callers cannot modify the cache
+        return list(api_messages)
     
     def get_last_user_message(self) -> Optional[Message]:
-        """Get the most recent user message."""
-        for message in reversed(self.messages):
-            if message.role == "user":
-                return message
-        return None
+        """Get the most recent user message (O(1), tracked by add_message)."""
+        if self._last_user_idx < 0:
+            return None
+        return self._messages[self._last_user_idx]
     
     def get_message_count(self) -> int:
-        """Get the number of messages in the conversation."""
-        return len(self.messages)
\ No newline at end of file
+        """Get the number of messages in the conversation (O(1))."""
+        return len(self._messages)
\ No newline at end of file
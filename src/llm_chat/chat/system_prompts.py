@@ -1,9 +1,13 @@
 """System prompts for different assistant types."""
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
+
+from ..utils.helpers import sanitize_html_content
 
 class AssistantType:
     """Defines a type of AI assistant with specialized system prompt."""
     
+    __slots__ = ("id", "name", "system_prompt", "description", "icon")
+    
     def __init__(self, 
                 id: str,
                 name: str, 
@@ -42,6 +46,15 @@ class SystemPromptManager:
     def __init__(self):
         """Initialize with default assistant types."""
         self.assistant_types = {}
+        # Reverse index from system prompt text to assistant type ID
+        self._prompt_index: Dict[str, str] = {}
+        # Resolved prompts and pre-formatted texts keyed by (kind, type ID)
+        self._text_cache: Dict[tuple, Optional[str]] = {}
+        # Snapshot of assistant_types values plus their selector labels and
+        # IDs, rebuilt when a type is added
+        self._types_snapshot: Tuple[AssistantType, ...] = ()
+        self._type_labels: Tuple[str, ...] = ()
+        self._type_ids: Tuple[str, ...] = ()
         self._initialize_defaults()
     
     def _initialize_defaults(self) -> None:
@@ -93,7 +106,16 @@ Follow these principles:
         Args:
             assistant_type: The assistant type to add
         """
+        previous = self.assistant_types.get(assistant_type.id)
+        if previous and self._prompt_index.get(previous.system_prompt) == previous.id:
+            del self._prompt_index[previous.system_prompt]
+        
         self.assistant_types[assistant_type.id] = assistant_type
+        self._prompt_index.setdefault(assistant_type.system_prompt, assistant_type.id)
+        self._text_cache.clear()
+        self._types_snapshot = tuple(self.assistant_types.values())
+        self._type_labels = tuple(f"{at.icon} {at.name}" for at in self._types_snapshot)
+        self._type_ids = tuple(at.id for at in self._types_snapshot)
     
     def get_assistant_type(self, type_id: str) -> Optional[AssistantType]:
         """Get an assistant type by ID.
@@ -106,6 +128,51 @@ Follow these principles:
         """
         return self.assistant_types.get(type_id)
     
+    def find_assistant_type_by_prompt(self, system_prompt: str) -> Optional[AssistantType]:
+        """Find the assistant type that uses a given system prompt.
+        
+        Args:
+            system_prompt: System prompt text to look up
+            
+        Returns:
+            The matching assistant type or None if no type uses this prompt
+        """
+        type_id = self._prompt_index.get(system_prompt)
+        return self.assistant_types.get(type_id) if type_id else None
+    
+    def get_welcome_message(self, type_id: str) -> str:
+        """Get the welcome text for a new conversation with an assistant type.
+        
+        Args:
+            type_id: ID of the assistant type
+            
+        Returns:
+            The welcome text (generic if the type is not found)
+        """
+        key = ("welcome", type_id)
+        if key not in self._text_cache:
+            assistant_type = self.get_assistant_type(type_id)
+            name = assistant_type.name if assistant_type else "AI Assistant"
+            self._text_cache[key] = f"Hello! I'm your {name}. How can I help you today?"
+        return self._text_cache[key]
+    
+    def get_switch_message(self, type_id: str) -> Optional[str]:
+        """Get the sanitized text announcing a switch to an assistant type.
+        
+        Args:
+            type_id: ID of the assistant type
+            
+        Returns:
+            The switch text or None if the type is not found
+        """
+        key = ("switch", type_id)
+        if key not in self._text_cache:
+            assistant_type = self.get_assistant_type(type_id)
+            self._text_cache[key] = sanitize_html_content(
+                f"I'm now in {assistant_type.name} mode. How can I assist you?"
+            ) if assistant_type else None
+        return self._text_cache[key]
+    
     def get_default_assistant_type(self) -> AssistantType:
         """Get the default assistant type.
         
@@ -114,13 +181,21 @@ Follow these principles:
         """
         return self.assistant_types["general"]
     
-    def get_all_assistant_types(self) -> List[AssistantType]:
+    def get_all_assistant_types(self) -> Tuple[AssistantType, ...]:
         """Get all available assistant types.
         
         Returns:
-            List of all assistant types
+            Tuple of all assistant types (shared, built when types change)
+        """
+        return self._types_snapshot
+    
+    def get_assistant_type_options(self) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        """Get display labels and IDs for an assistant type selector.
+        
+        Returns:
+            Tuple of (labels, IDs), in the same order as get_all_assistant_types
         """
-        return list(self.assistant_types.values())
+        return self._type_labels, self._type_ids
     
     def get_system_prompt(self, type_id: str) -> str:
         """Get the system prompt for a given assistant type.
@@ -131,10 +206,12 @@ Follow these principles:
         Returns:
             The system prompt text or default if type not found
         """
-        assistant_type = self.get_assistant_type(type_id)
-        if assistant_type:
-            return assistant_type.system_prompt
-        return self.get_default_assistant_type().system_prompt
+        key = ("prompt", type_id)
+        prompt = self._text_cache.get(key)
+        if prompt is None:
+            assistant_type = self.get_assistant_type(type_id) or self.get_default_assistant_type()
+            prompt = self._text_cache[key] = assistant_type.system_prompt
+        return prompt
 
 
 # Create a singleton instance
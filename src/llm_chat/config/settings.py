@@ -1,25 +1,43 @@
 """Application settings and configuration."""
 import os
+from functools import lru_cache
 from pathlib import Path
 from dotenv import load_dotenv
 import importlib.metadata
 import logging
 from typing import Dict, Any, Optional
 
+
+def configure_logging() -> None:
+    """Configure root logging once per process.
+    
+    Streamlit re-executes page scripts on every rerun, so entry points call
+    this instead of logging.basicConfig; it returns immediately once the
+    root logger has handlers.
+    """
+    root = logging.getLogger()
+    if root.handlers:
+        return
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+
 # Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # Load environment variables from .env file
 load_dotenv()
 
 
+@lru_cache(maxsize=1)
 def get_version() -> str:
     """Get the application version.
     
+    The version is resolved once per process.
+    
     Returns:
         Version string
     """
@@ -45,23 +63,31 @@ def get_openai_api_key() -> Optional[str]:
     return os.getenv("OPENAI_API_KEY")
 
 
+# Default application settings
+_DEFAULT_SETTINGS: Dict[str, Any] = {
+    "model": "gpt-3.5-turbo",
+    "temperature": 0.7,
+    "max_tokens": 1024,
+    "assistant_type": "general",
+    "response_cache": False
+}
+
+
 def get_default_settings() -> Dict[str, Any]:
     """Get default application settings.
     
     Returns:
-        Dictionary of default settings
+        Dictionary of default settings (a fresh copy the caller may modify)
     """
-    return {
-        "model": "gpt-3.5-turbo",
-        "temperature": 0.7,
-        "max_tokens": 1024,
-        "assistant_type": "general"
-    }
+    return dict(_DEFAULT_SETTINGS)
 
 
+@lru_cache(maxsize=1)
 def get_app_config() -> Dict[str, Any]:
     """Get application configuration.
     
+    The configuration is computed once per process; treat it as read-only.
+    
     Returns:
         Dictionary of configuration values
     """
@@ -71,6 +97,9 @@ def get_app_config() -> Dict[str, Any]:
         "default_settings": get_default_settings(),
         "app_name": "AI Chat",
         "app_icon": "💬",
+        "auto_save_interval": 5,
+        "max_context_messages": 50,
+        "render_window": 30,
     }
 
 
@@ -1,11 +1,10 @@
 """Main entry point for the Streamlit chat application."""
 import logging
 
+from llm_chat.config.settings import configure_logging
+
 # Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 # Import app module from the same package
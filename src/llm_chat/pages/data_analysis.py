@@ -2,40 +2,30 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
+import io
 import os
 import logging
-import openai
-from openai import OpenAI
+import time
 from dotenv import load_dotenv
 
+from llm_chat.app import get_chat_client
+from llm_chat.chat.client import apply_openai_patches
+from llm_chat.config.settings import configure_logging
+
 # Load environment variables from .env file
 load_dotenv()
 
 # Set up logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-)
+configure_logging()
 logger = logging.getLogger(__name__)
 
-# Monkey patch the OpenAI client to bypass the proxies issue
-# (Only apply if not already patched in main.py)
-if not hasattr(openai, "_patched_for_proxies"):
-    original_init = openai._base_client.SyncHttpxClientWrapper.__init__
-
-    def patched_init(self, *args, **kwargs):
-        # Remove the proxies parameter if it exists
-        if 'proxies' in kwargs:
-            del kwargs['proxies']
-        original_init(self, *args, **kwargs)
-
-    # Apply the monkey patch
-    openai._base_client.SyncHttpxClientWrapper.__init__ = patched_init
-    openai._patched_for_proxies = True
+# Patch the OpenAI client to bypass the proxies issue (no-op if already applied)
+apply_openai_patches()
 
-# Initialize OpenAI API client
+# Reuse the chat client shared with the chat page (one per API key and process)
 api_key = os.getenv("OPENAI_API_KEY")
-client = OpenAI(api_key=api_key)
+chat_client = get_chat_client(api_key)
+client = chat_client.client
 
 st.set_page_config(page_title="AI Data Analysis", page_icon="📊")
 
@@ -56,21 +46,175 @@ def get_sample_data() -> pd.DataFrame:
         pd.DataFrame: Sample dataframe
     """
     logger.info("Generating cached sample data")
-    np.random.seed(42)
+    # Local generator so seeding does not touch numpy's global random state
+    rng = np.random.default_rng(42)
+    categories = np.array(["A", "B", "C", "D"])
     data = {
-        "category": np.random.choice(["A", "B", "C", "D"], size=100),
-        "value1": np.random.randn(100),
-        "value2": np.random.randn(100) * 2 + 1,
+        "category": categories[rng.integers(0, len(categories), size=100)],
+        "value1": rng.standard_normal(100, dtype=np.float32),
+        "value2": rng.standard_normal(100, dtype=np.float32) * 2 + 1,
         "date": pd.date_range(start="2023-01-01", periods=100)
     }
     return pd.DataFrame(data)
 
+@st.cache_data(show_spinner=False)
+def parse_csv(file_bytes: bytes) -> pd.DataFrame:
+    """Parse uploaded CSV bytes with caching.
+    
+    Uses the multithreaded pyarrow parser (pyarrow ships with Streamlit),
+    falling back to the default pandas parser for files it rejects.
+    
+    Args:
+        file_bytes: Raw contents of the uploaded file
+        
+    Returns:
+        pd.DataFrame: Parsed dataframe
+    """
+    start = time.perf_counter()
+    try:
+        data = pd.read_csv(io.BytesIO(file_bytes), engine="pyarrow")
+    except Exception as e:
+        logger.warning(f"pyarrow CSV parser failed ({e}), using the default parser")
+        data = pd.read_csv(io.BytesIO(file_bytes))
+    logger.info(f"Parsed uploaded CSV ({len(file_bytes)} bytes) in {(time.perf_counter() - start) * 1000:.0f} ms")
+    return data
+
+def numeric_columns(data: pd.DataFrame) -> list:
+    """Get the names of the integer, unsigned and float columns.
+    
+    Checks each dtype's kind code in one pass instead of going through
+    select_dtypes, which builds a filtered copy of the frame.
+    
+    Args:
+        data: Dataframe to inspect
+        
+    Returns:
+        list: Numeric column names in column order
+    """
+    return [col for col, dtype in data.dtypes.items() if dtype.kind in "iuf"]
+
+def compact_profile(data: pd.DataFrame, n_rows: int = 3) -> str:
+    """Build a compact text summary of a dataframe for LLM prompts.
+    
+    Each column is listed on one line with its dtype, null count and (for
+    numeric columns) mean, std, min and max to 3 significant figures,
+    followed by the first rows in CSV form.
+    
+    Args:
+        data: Dataframe to summarize
+        n_rows: Number of sample rows to include
+        
+    Returns:
+        str: Summary text
+    """
+    nulls = data.isna().sum()
+    numeric = data[numeric_columns(data)]
+    stats = numeric.agg(["mean", "std", "min", "max"]) if not numeric.empty else None
+    
+    lines = []
+    for col, dtype in data.dtypes.items():
+        line = f"{col}({dtype}): nulls={nulls[col]}"
+        if stats is not None and col in stats.columns:
+            line += ", " + ", ".join(f"{stat}={value:.3g}" for stat, value in stats[col].items())
+        lines.append(line)
+    
+    lines.append(f"First {n_rows} rows:")
+    lines.append(data.head(n_rows).to_csv(index=False).strip())
+    return "\n".join(lines)
+
+def column_histograms(data: pd.DataFrame, bins: int = 30) -> np.ndarray:
+    """Compute a histogram for every column of a numeric dataframe at once.
+    
+    Each column gets its own equal-width bins over its min..max range (as
+    np.histogram does), but all columns are binned and counted in a single
+    vectorized pass instead of one np.histogram call per column.
+    
+    Args:
+        data: Dataframe of numeric columns
+        bins: Number of bins per column
+        
+    Returns:
+        np.ndarray: Counts with shape (bins, number of columns)
+    """
+    values = data.to_numpy(dtype=np.float64)
+    n_cols = values.shape[1]
+    valid = np.isfinite(values)
+    
+    lo = np.where(valid, values, np.inf).min(axis=0)
+    hi = np.where(valid, values, -np.inf).max(axis=0)
+    span = hi - lo
+    # Constant columns get a unit-wide range around the value, like np.histogram
+    flat = span == 0
+    lo = np.where(flat, lo - 0.5, lo)
+    span = np.where(flat, 1.0, span)
+    
+    with np.errstate(invalid="ignore"):
+        idx = np.floor((values - lo) / span * bins)
+    idx = np.clip(np.nan_to_num(idx), 0, bins - 1).astype(np.intp)
+    
+    # Offset each column's bin indices so one bincount covers all columns
+    flat_idx = (idx + np.arange(n_cols) * bins)[valid]
+    counts = np.bincount(flat_idx, minlength=bins * n_cols)
+    return counts.reshape(n_cols, bins).T
+
+@st.cache_data(show_spinner=False)
+def get_data_profile(data: pd.DataFrame) -> dict:
+    """Compute the dataset summaries used for display and prompts.
+    
+    Cached on the dataframe contents, so reruns and repeated Analyze
+    clicks do not rescan the data.
+    
+    Args:
+        data: Dataframe to profile
+        
+    Returns:
+        dict: Shape, numeric column names, summary statistics and the
+            system prompt and dataset description used in analysis prompts
+    """
+    rows, cols = data.shape
+    columns = ", ".join(map(str, data.columns))
+    return {
+        "shape": data.shape,
+        "numeric_cols": numeric_columns(data),
+        "describe": data.describe(),
+        "system_prompt": (
+            f"You are a helpful data analysis assistant. The user has uploaded a dataset with {rows} rows "
+            f"and the following columns: {columns}. Help them analyze and understand their data."
+        ),
+        "description": f"Dataset Summary ({rows} rows x {cols} columns):\n{compact_profile(data)}",
+    }
+
+def build_analysis_messages(profile: dict, question: str) -> list:
+    """Build the API messages for one question about the profiled dataset.
+    
+    Only the question is formatted per call; the dataset context comes
+    pre-built from the cached profile.
+    
+    Args:
+        profile: Data profile from get_data_profile
+        question: The user's question
+        
+    Returns:
+        list: System and user message dictionaries
+    """
+    return [
+        {"role": "system", "content": profile["system_prompt"]},
+        {"role": "user", "content": f"{profile['description']}\n\nQuestion: {question}"},
+    ]
+
+# Questions answered together by "Run standard analyses", keyed by tab label
+STANDARD_ANALYSES = {
+    "Summary": "Give a short overview of this dataset and what it appears to describe.",
+    "Trends": "What notable trends or correlations does this dataset show?",
+    "Outliers": "Which columns have outliers or suspicious values, and how should they be handled?",
+}
+
 # Allow file upload for real data
 uploaded_file = st.file_uploader("Upload your CSV data for analysis", type=["csv"])
 
 if uploaded_file is not None:
     try:
-        data = pd.read_csv(uploaded_file)
+        data = parse_csv(uploaded_file.getvalue())
         st.success(f"Successfully loaded data with {len(data)} rows and {len(data.columns)} columns")
         logger.info(f"User uploaded file: {uploaded_file.name}")
     except Exception as e:
@@ -82,6 +226,8 @@ else:
     st.info("No file uploaded. Using sample data for demonstration.")
     data = get_sample_data()
 
+profile = get_data_profile(data)
+
 # Display data overview
 st.subheader("Data Overview")
 st.dataframe(data.head())
@@ -90,7 +236,7 @@ st.dataframe(data.head())
 col1, col2 = st.columns(2)
 with col1:
     st.subheader("Summary Statistics")
-    st.dataframe(data.describe())
+    st.dataframe(profile["describe"])
 
 with col2:
     if "category" in data.columns:
@@ -106,12 +252,6 @@ st.subheader("AI-Powered Data Analysis")
 if "data_analysis_messages" not in st.session_state:
     st.session_state.data_analysis_messages = []
 
-# Create a default system message about data analysis
-default_system_message = {
-    "role": "system", 
-    "content": f"You are a helpful data analysis assistant. The user has uploaded a dataset with {len(data)} rows and the following columns: {', '.join(data.columns)}. Help them analyze and understand their data."
-}
-
 # Chat input for data analysis questions
 analysis_prompt = st.text_area("Ask a question about your data:", 
                               placeholder="Example: What are the key trends in this data? or Can you suggest visualizations for this dataset?",
@@ -119,45 +259,33 @@ analysis_prompt = st.text_area("Ask a question about your data:",
 
 if st.button("Analyze"):
     if analysis_prompt:
-        # Show spinner while processing
-        with st.spinner("Analyzing data..."):
-            # Create messages for this specific query
-            messages = [default_system_message]
-            
-            # Add data description to provide context
-            data_description = f"""
-            Dataset Summary:
-            - Shape: {data.shape}
-            - Columns: {', '.join(data.columns)}
-            - Data Types: {dict(data.dtypes.astype(str))}
-            - Sample data (first 5 rows): {data.head().to_dict()}
-            - Summary statistics: {data.describe().to_dict()}
-            """
-            
-            messages.append({"role": "user", "content": f"{data_description}\n\nQuestion: {analysis_prompt}"})
-            
-            try:
-                # Call OpenAI API
-                response = client.chat.completions.create(
+        # Create messages for this specific query
+        messages = build_analysis_messages(profile, analysis_prompt)
+        
+        try:
+            # Call OpenAI API; the spinner only covers the wait for the stream to open
+            with st.spinner("Analyzing data..."):
+                stream = client.chat.completions.create(
                     model="gpt-3.5-turbo",
                     messages=messages,
                     temperature=0.7,
-                    max_tokens=1024
+                    max_tokens=1024,
+                    stream=True
                 )
-                
-                analysis_result = response.choices[0].message.content
-                
-                # Display the result
-                st.markdown("### Analysis Results")
-                st.markdown(analysis_result)
-                
-                # Store in session state
-                st.session_state.data_analysis_messages.append({"role": "user", "content": analysis_prompt})
-                st.session_state.data_analysis_messages.append({"role": "assistant", "content": analysis_result})
-                
-            except Exception as e:
-                st.error(f"Error during analysis: {str(e)}")
-                logger.error(f"OpenAI API error: {e}")
+            
+            # Display the result as it is generated
+            st.markdown("### Analysis Results")
+            analysis_result = st.write_stream(
+                chunk.choices[0].delta.content or "" for chunk in stream if chunk.choices
+            )
+            
+            # Store in session state
+            st.session_state.data_analysis_messages.append({"role": "user", "content": analysis_prompt})
+            st.session_state.data_analysis_messages.append({"role": "assistant", "content": analysis_result})
+            
+        except Exception as e:
+            st.error(f"Error during analysis: {str(e)}")
+            logger.error(f"OpenAI API error: {e}")
     else:
         st.warning("Please enter a question about your data.")
 
@@ -169,9 +297,33 @@ if st.session_state.data_analysis_messages:
 
 # Advanced options
 with st.expander("Advanced Options"):
+    st.subheader("Standard Analyses")
+    
+    if st.button("Run standard analyses"):
+        # Send all analyses at once; they run concurrently on one event loop
+        analysis_requests = [
+            build_analysis_messages(profile, question)
+            for question in STANDARD_ANALYSES.values()
+        ]
+        with st.spinner("Running analyses..."):
+            results = chat_client.get_completions_batch(
+                analysis_requests,
+                model="gpt-3.5-turbo",
+                temperature=0.7,
+                max_tokens=1024
+            )
+        st.session_state.standard_analyses = (profile["description"], results)
+    
+    # Keep showing the results across reruns until the data changes
+    standard_analyses = st.session_state.get("standard_analyses")
+    if standard_analyses and standard_analyses[0] == profile["description"]:
+        for tab, result in zip(st.tabs(list(STANDARD_ANALYSES)), standard_analyses[1]):
+            with tab:
+                st.markdown(result)
+    
     st.subheader("Custom Visualization")
     
-    numeric_cols = data.select_dtypes(include=["float64", "int64"]).columns.tolist()
+    numeric_cols = profile["numeric_cols"]
     
     if len(numeric_cols) >= 2:
         chart_type = st.selectbox(
@@ -187,21 +339,22 @@ with st.expander("Advanced Options"):
         )
         
         if selected_cols:
+            # Select the chart columns once for all branches
+            chart_data = data[selected_cols]
+            
             if chart_type == "Line":
-                st.line_chart(data[selected_cols])
+                st.line_chart(chart_data)
             elif chart_type == "Bar":
-                st.bar_chart(data[selected_cols])
+                st.bar_chart(chart_data)
             elif chart_type == "Scatter" and len(selected_cols) >= 2:
                 x_col = st.selectbox("X axis", options=selected_cols, index=0)
                 y_col = st.selectbox("Y axis", options=selected_cols, index=min(1, len(selected_cols)-1))
                 
-                scatter_data = pd.DataFrame({
-                    "x": data[x_col],
-                    "y": data[y_col]
-                })
-                st.scatter_chart(scatter_data)
+                # Plot straight from the selected columns without building a copy
+                st.scatter_chart(chart_data, x=x_col, y=y_col)
             elif chart_type == "Histogram" and selected_cols:
-                for col in selected_cols:
+                hist_data = chart_data[[col for col in selected_cols if col in numeric_cols]]
+                hist_counts = column_histograms(hist_data, bins=30)
+                for i, col in enumerate(hist_data.columns):
                     st.subheader(f"Histogram of {col}")
-                    hist_values = np.histogram(data[col].dropna(), bins=30)[0]
-                    st.bar_chart(hist_values)
\ No newline at end of file
+                    st.bar_chart(hist_counts[:, i])
\ No newline at end of file
@@ -1,118 +1,196 @@
 """Chat interface components for Streamlit UI."""
 import streamlit as st
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from typing import Iterable, List, Any, Optional, Tuple
 
-from ..chat.message import Message, Conversation
+from ..chat.message import ROLE_SYSTEM, ROLE_USER, Message, Conversation
 from ..chat.system_prompts import AssistantType
+from ..utils.helpers import sanitize_html_content
 
 
-# Update the render_message function in src/llm_chat/ui/chat_ui.py
-def render_message(message: Message, assistant_type: Optional[AssistantType] = None) -> None:
-    """Render a single chat message using Streamlit native components."""
-    role = message.role
-    content = message.content
-    timestamp = message.timestamp
-    
-    # Define styles based on the role
-    if role == "user":
-        box_color = "#e3f2fd"
-        avatar = "👤"
-        name = "You"
-    elif role == "system":
-        box_color = "#f3e5f5"
-        avatar = "⚙️"
-        name = "System"
+# HTML for a single chat message, split around the message content so a
+# streaming reply can be wrapped without re-formatting the template
+_MESSAGE_PREFIX_TEMPLATE = (
+    "<div style='display:flex; align-items:flex-start; margin-bottom:25px;'>"
+    "<div style='font-size:1.5rem; width:3rem; flex-shrink:0; text-align:center;'>{avatar}</div>"
+    "<div style='flex-grow:1;'>"
+    "<div style='display:flex; justify-content:space-between;'><strong>{name}</strong>"
+    "<span style='color:#666; font-size:0.8rem;'>{timestamp}</span></div>"
+    "<div style='background-color:{box_color}; padding:10px; border-radius:10px; margin-top:5px;'>"
+)
+_MESSAGE_SUFFIX = "</div></div></div>"
+
+
+# Avatar, display name and box color for roles that do not depend on the
+# assistant type; every other role is styled as the assistant
+_ROLE_STYLES = {
+    ROLE_USER: ("👤", "You", "#e3f2fd"),
+    ROLE_SYSTEM: ("⚙️", "System", "#f3e5f5"),
+}
+
+# HTML template for the application header
+_HEADER_TEMPLATE = (
+    '<div class="main-header">'
+    '<h1>{title}</h1>'
+    '<div class="version-tag">v{version}</div>'
+    '</div>'
+)
+
+
+def _message_frame(role: str, timestamp: Optional[str],
+                   assistant_icon: Optional[str], assistant_name: Optional[str]) -> Tuple[str, str]:
+    """Build the HTML that goes before and after a chat message's content."""
+    # Look up styles based on the role
+    style = _ROLE_STYLES.get(role)
+    if style is not None:
+        avatar, name, box_color = style
     else:
+        avatar = assistant_icon or "🤖"
+        name = assistant_name or "AI Assistant"
         box_color = "#f5f5f5"
-        avatar = assistant_type.icon if assistant_type else "🤖"
-        name = assistant_type.name if assistant_type else "AI Assistant"
     
-    # Create a container with custom CSS
-    message_container = st.container()
+    prefix = _MESSAGE_PREFIX_TEMPLATE.format_map({
+        "avatar": avatar,
+        "name": name,
+        "timestamp": timestamp,
+        "box_color": box_color,
+    })
+    return prefix, _MESSAGE_SUFFIX
+
+
+def _build_message_html(role: str, content: str, timestamp: Optional[str],
+                        assistant_icon: Optional[str], assistant_name: Optional[str]) -> str:
+    """Build the HTML for a single chat message from its display fields."""
+    prefix, suffix = _message_frame(role, timestamp, assistant_icon, assistant_name)
+    # Keep the markup on a single HTML block so several messages can be
+    # emitted together in one st.markdown call
+    return prefix + content.replace("\n", "<br>") + suffix
+
+
+# Finished messages never change, so their HTML is memoized across reruns
+_cached_message_html = lru_cache(maxsize=2048)(_build_message_html)
+
+
+def _message_html_args(message: Message, assistant_type: Optional[AssistantType]) -> tuple:
+    """Get the fields that determine a message's HTML."""
+    if message.role == ROLE_USER or message.role == ROLE_SYSTEM or assistant_type is None:
+        return message.role, message.content, message.timestamp, None, None
+    return message.role, message.content, message.timestamp, assistant_type.icon, assistant_type.name
+
+
+def format_message(message: Message, assistant_type: Optional[AssistantType] = None) -> str:
+    """Build the HTML for a single chat message.
     
-    with message_container:
-        # Use columns for layout
-        col1, col2 = st.columns([1, 20])
+    Args:
+        message: Message to format
+        assistant_type: Current assistant type (optional)
         
-        with col1:
-            st.markdown(f"<div style='font-size:1.5rem; text-align:center;'>{avatar}</div>", unsafe_allow_html=True)
+    Returns:
+        HTML string for the message
+    """
+    return _cached_message_html(*_message_html_args(message, assistant_type))
+
+
+def format_messages(messages: List[Message], assistant_type: Optional[AssistantType] = None) -> str:
+    """Build the HTML for a list of chat messages.
+    
+    Args:
+        messages: Messages to format
+        assistant_type: Current assistant type (optional)
         
-        with col2:
-            # Message header with name and timestamp
-            st.markdown(f"<div style='display:flex; justify-content:space-between;'><strong>{name}</strong><span style='color:#666; font-size:0.8rem;'>{timestamp}</span></div>", unsafe_allow_html=True)
-            
-            # Message content in a colored box
-            st.markdown(f"""
-            <div style='background-color:{box_color}; padding:10px; border-radius:10px; margin-top:5px; margin-bottom:15px;'>
-                {content}
-            </div>
-            """, unsafe_allow_html=True)
+    Returns:
+        Concatenated HTML string for all messages
+    """
+    return "".join([format_message(m, assistant_type) for m in messages])
+
+
+def render_message(message: Message, assistant_type: Optional[AssistantType] = None) -> None:
+    """Render a single chat message."""
+    st.markdown(format_message(message, assistant_type), unsafe_allow_html=True)
+
+
+def render_streaming_message(chunks: Iterable[str],
+                             assistant_type: Optional[AssistantType] = None) -> str:
+    """Render an assistant reply in place as its chunks arrive.
+    
+    The reply is drawn into a single placeholder with the same styling as
+    finished messages, so nothing jumps when the conversation is redrawn.
+    Each chunk is escaped and line-broken once and appended to the displayed
+    content, and the message frame is built once, so the Python work per
+    redraw is proportional to the chunk. Sending the redraw still costs the
+    full reply length, since st.markdown replaces the whole element; pass
+    chunks coalesced by StreamBuffer (as ChatClient.stream_completion does)
+    to bound the number of redraws.
+    
+    Args:
+        chunks: Iterable of response text pieces
+        assistant_type: Current assistant type (optional)
         
-        # Add some space after each message
-        st.markdown("<div style='height: 10px;'></div>", unsafe_allow_html=True)
+    Returns:
+        The complete (unsanitized) response text
+    """
+    placeholder = st.empty()
+    # Partial replies bypass the HTML cache so they do not evict finished messages
+    role, _, timestamp, icon, name = _message_html_args(Message.assistant_message(""), assistant_type)
+    prefix, suffix = _message_frame(role, timestamp, icon, name)
+    parts: List[str] = []
+    # Escaping and line breaks work per character, so each chunk is
+    # converted once on arrival and appended to the displayed content
+    content = ""
+    
+    for chunk in chunks:
+        parts.append(chunk)
+        content += sanitize_html_content(chunk).replace("\n", "<br>")
+        placeholder.markdown(prefix + content + suffix, unsafe_allow_html=True)
+    
+    return "".join(parts)
 
 
-def render_conversation(conversation: Conversation, assistant_type: Optional[AssistantType] = None) -> None:
-    """Render a complete conversation.
+def render_conversation(conversation: Conversation,
+                        assistant_type: Optional[AssistantType] = None,
+                        target: Optional[Any] = None,
+                        max_messages: Optional[int] = None) -> None:
+    """Render a conversation.
     
     Args:
         conversation: Conversation object to render
         assistant_type: Current assistant type (optional)
+        target: Streamlit container or st.empty slot to render into
+            (defaults to the current container)
+        max_messages: Only render the most recent N messages (None renders all)
     """
-    for message in conversation.messages:
-        render_message(message, assistant_type)
+    messages = conversation.messages
+    # Messages are only ever appended, so the count and last message identify
+    # the content; reuse the HTML built on an earlier rerun if nothing changed
+    signature = (conversation, len(messages), messages[-1] if messages else None,
+                 assistant_type, max_messages)
+    cached = st.session_state.get("_conversation_html")
+    if cached is not None and cached[0] == signature:
+        html = cached[1]
+    else:
+        if max_messages is not None and len(messages) > max_messages:
+            messages = messages[len(messages) - max_messages:]
+        html = f'<div class="chat-container">{format_messages(messages, assistant_type)}</div>'
+        st.session_state["_conversation_html"] = (signature, html)
+    
+    # Always emit the element: Streamlit removes anything a rerun does not redraw
+    (target or st).markdown(html, unsafe_allow_html=True)
 
 
 def render_header(title: str, version: str) -> None:
     """Render an improved application header."""
-    st.markdown(f"""
-    <div class="main-header">
-        <h1>{title}</h1>
-        <div class="version-tag">v{version}</div>
-    </div>
-    """, unsafe_allow_html=True)
+    st.markdown(_HEADER_TEMPLATE.format_map({"title": title, "version": version}),
+                unsafe_allow_html=True)
 
 
-def render_chat_input() -> str:
-    """Render the chat input box and return user input if any."""
+def render_chat_input() -> Optional[str]:
+    """Render the chat input box and return user input if any.
+    
+    Returns:
+        The submitted text, or None when nothing was submitted this run
+    """
     # Add some vertical space before the input
     st.markdown("<div style='height: 40px;'></div>", unsafe_allow_html=True)
     
-    # Add a fixed position container for the chat input
-    st.markdown("""
-    <style>
-    .chat-input-fixed {
-        position: fixed;
-        bottom: 0;
-        left: 0;
-        right: 0;
-        padding: 1rem;
-        background-color: white;
-        z-index: 1000;
-        border-top: 1px solid #f0f0f0;
-        box-shadow: 0 -2px 5px rgba(0,0,0,0.1);
-    }
-    </style>
-    """, unsafe_allow_html=True)
-    
     # Return the Streamlit chat input
     return st.chat_input("Send a message...")
-
-
-
-
-def format_date(date_str: str) -> str:
-    """Format ISO date string to human-readable format.
-    
-    Args:
-        date_str: ISO format date string
-        
-    Returns:
-        Formatted date string
-    """
-    try:
-        date_obj = datetime.fromisoformat(date_str)
-        return date_obj.strftime("%b %d, %Y %H:%M")
-    except:
-        return date_str
\ No newline at end of file
@@ -5,7 +5,33 @@ import os
 
 from ..chat.history import ChatHistoryManager
 from ..chat.system_prompts import system_prompt_manager
-from .chat_ui import format_date
+from ..utils.helpers import sanitize_html_content
+
+
+# HTML for one entry in the conversation list
+_CONVERSATION_CARD_TEMPLATE = (
+    '<div class="conversation-card {active}">'
+    '<div class="conversation-title">{title}</div>'
+    '<div class="conversation-meta">'
+    '<span>{updated}</span>'
+    '<span>{message_count} messages</span>'
+    '</div>'
+    '</div>'
+)
+
+
+# Number of conversations listed per "Show older" step
+_CONVERSATION_PAGE_SIZE = 20
+
+
+# HTML for the selected assistant type card
+_ASSISTANT_CARD_TEMPLATE = (
+    '<div class="assistant-card selected">'
+    '<div class="assistant-icon">{icon}</div>'
+    '<div class="assistant-name">{name}</div>'
+    '<div class="assistant-description">{description}</div>'
+    '</div>'
+)
 
 
 def render_settings_sidebar(version: str) -> Dict[str, Any]:
@@ -14,8 +40,7 @@ def render_settings_sidebar(version: str) -> Dict[str, Any]:
     
     # Get all assistant types
     assistant_types = system_prompt_manager.get_all_assistant_types()
-    assistant_type_options = [f"{at.icon} {at.name}" for at in assistant_types]
-    assistant_type_ids = [at.id for at in assistant_types]
+    assistant_type_options, assistant_type_ids = system_prompt_manager.get_assistant_type_options()
     
     # Get current assistant type from session state (default to general)
     current_assistant_type = st.session_state.get("assistant_type", "general")
@@ -34,42 +59,16 @@ def render_settings_sidebar(version: str) -> Dict[str, Any]:
         ),
         "temperature": st.sidebar.slider("Temperature", 0.0, 1.0, 0.7, 0.1),
         "max_tokens": st.sidebar.slider("Max Tokens", 256, 4096, 1024, 128),
+        "response_cache": st.sidebar.checkbox(
+            "Reuse answers to similar questions",
+            value=False,
+            help="Answer from this session's cache instead of the API when the same "
+                 "or a closely paraphrased question was already asked after the same "
+                 "earlier messages, e.g. the opening question of a new chat.",
+            key="response_cache_toggle"
+        ),
     }
     
-    # Add custom CSS for assistant type cards
-    st.markdown("""
-    <style>
-    .assistant-card {
-        background-color: #f8f9fa;
-        border-radius: 8px;
-        padding: 12px;
-        margin-bottom: 10px;
-        border-left: 3px solid transparent;
-        cursor: pointer;
-        transition: all 0.2s ease;
-    }
-    .assistant-card:hover {
-        background-color: #f0f1f2;
-    }
-    .assistant-card.selected {
-        border-left-color: #2196F3;
-        background-color: #e6f7ff;
-    }
-    .assistant-icon {
-        font-size: 1.5rem;
-        margin-right: 0.5rem;
-    }
-    .assistant-name {
-        font-weight: 600;
-        margin-bottom: 4px;
-    }
-    .assistant-description {
-        font-size: 0.85rem;
-        color: #666;
-    }
-    </style>
-    """, unsafe_allow_html=True)
-    
     # Add assistant type selector header
     st.sidebar.markdown("### Assistant Type")
     
@@ -87,13 +86,11 @@ def render_settings_sidebar(version: str) -> Dict[str, Any]:
     
     # Show selected assistant type details
     selected_assistant = assistant_types[selected_assistant_index]
-    st.sidebar.markdown(f"""
-    <div class="assistant-card selected">
-        <div class="assistant-icon">{selected_assistant.icon}</div>
-        <div class="assistant-name">{selected_assistant.name}</div>
-        <div class="assistant-description">{selected_assistant.description}</div>
-    </div>
-    """, unsafe_allow_html=True)
+    st.sidebar.markdown(_ASSISTANT_CARD_TEMPLATE.format_map({
+        "icon": selected_assistant.icon,
+        "name": selected_assistant.name,
+        "description": selected_assistant.description,
+    }), unsafe_allow_html=True)
     
     return settings
 
@@ -127,7 +124,37 @@ def handle_rename_start(conversation_id: str, current_title: str) -> None:
     st.session_state.show_rename_ui = True
     st.session_state.new_title = current_title
     st.session_state.conversation_id_to_rename = conversation_id
-    st.rerun()
+
+
+def _close_rename() -> None:
+    """Hide the rename UI."""
+    st.session_state.show_rename_ui = False
+
+
+def _save_rename(on_rename_conversation: Optional[Callable[[str, str], None]]) -> None:
+    """Apply the title entered in the rename UI and hide it."""
+    if on_rename_conversation and "conversation_id_to_rename" in st.session_state:
+        on_rename_conversation(st.session_state.conversation_id_to_rename,
+                               st.session_state.get("rename_input", ""))
+    _close_rename()
+
+
+def _show_older_conversations() -> None:
+    """Extend the conversation list by another page."""
+    st.session_state.conversation_list_limit = (
+        st.session_state.get("conversation_list_limit", _CONVERSATION_PAGE_SIZE)
+        + _CONVERSATION_PAGE_SIZE
+    )
+
+
+def reset_conversation_selector() -> None:
+    """Point the conversation selector back at the current conversation.
+    
+    The selector is a keyed widget, so after its first render Streamlit keeps
+    its value and ignores ``index``. Code that switches the current
+    conversation calls this so the next run starts the selector over.
+    """
+    st.session_state.pop("conversation_selector", None)
 
 
 def render_conversation_sidebar(
@@ -138,44 +165,36 @@ def render_conversation_sidebar(
     on_rename_conversation: Optional[Callable[[str, str], None]] = None,
     on_delete_conversation: Optional[Callable[[str], None]] = None
 ) -> None:
-    """Render improved conversation sidebar for managing chat history."""
+    """Render improved conversation sidebar for managing chat history.
+    
+    Actions run as button callbacks, before the script reruns, so their
+    changes show up in the rerun the click already triggers instead of
+    needing another st.rerun().
+    """
     st.sidebar.markdown("<div class='sidebar-header'>Conversations</div>", unsafe_allow_html=True)
     
     # New conversation button 
-    if st.sidebar.button("➕ New Conversation", key="new_conversation_btn", use_container_width=True):
-        if on_new_conversation:
-            on_new_conversation()
+    st.sidebar.button("➕ New Conversation", key="new_conversation_btn", use_container_width=True,
+                      on_click=on_new_conversation)
     
     # Show rename UI if active
-    if "show_rename_ui" in st.session_state and st.session_state.show_rename_ui:
-        with st.sidebar.container():
-            st.markdown("""
-            <div style="background-color: white; padding: 15px; border-radius: 8px; 
-                        margin: 15px 0; box-shadow: 0 2px 5px rgba(0,0,0,0.1);">
-                <h4 style="margin-top: 0; margin-bottom: 10px; color: #333;">Rename Conversation</h4>
-            </div>
-            """, unsafe_allow_html=True)
-            
-            new_title = st.text_input(
-                "New title", 
-                value=st.session_state.get("new_title", ""),
-                key="rename_input",
-                placeholder="Enter new title..."
-            )
-            
-            col1, col2 = st.columns(2)
-            
-            with col1:
-                if st.button("💾 Save", key="save_rename", use_container_width=True):
-                    if on_rename_conversation and "conversation_id_to_rename" in st.session_state:
-                        on_rename_conversation(st.session_state.conversation_id_to_rename, new_title)
-                    st.session_state.show_rename_ui = False
-                    st.rerun()
-            
-            with col2:
-                if st.button("❌ Cancel", key="cancel_rename", use_container_width=True):
-                    st.session_state.show_rename_ui = False
-                    st.rerun()
+    if st.session_state.get("show_rename_ui"):
+        st.sidebar.text_input(
+            "Rename conversation",
+            value=st.session_state.get("new_title", ""),
+            key="rename_input",
+            placeholder="Enter new title..."
+        )
+        
+        col1, col2 = st.sidebar.columns(2)
+        
+        with col1:
+            st.button("💾 Save", key="save_rename", use_container_width=True,
+                      on_click=_save_rename, args=(on_rename_conversation,))
+        
+        with col2:
+            st.button("❌ Cancel", key="cancel_rename", use_container_width=True,
+                      on_click=_close_rename)
     
     # Divider
     st.sidebar.markdown("---")
@@ -187,40 +206,56 @@ def render_conversation_sidebar(
         st.sidebar.info("No saved conversations yet.")
         return
     
-    # Display conversations with material design cards
-    for conv in conversations:
-        # Determine if this is the active conversation
-        is_active = current_conversation_id == conv["id"]
-        
-        # Create a container for each conversation item
-        with st.sidebar.container():
-            # Display conversation info with styling
-            st.markdown(
-                f"""
-                <div class="conversation-card {"active" if is_active else ""}">
-                    <div class="conversation-title">{conv["title"]}</div>
-                    <div class="conversation-meta">
-                        <span>{format_date(conv["updated"])}</span>
-                        <span>{conv["message_count"]} messages</span>
-                    </div>
-                </div>
-                """, 
-                unsafe_allow_html=True
-            )
-            
-            # Standard buttons without visibility tricks
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                if st.button("Load", key=f"load_{conv['id']}", use_container_width=True):
-                    if on_load_conversation and not is_active:
-                        on_load_conversation(conv["id"])
-            
-            with col2:
-                if st.button("Rename", key=f"rename_{conv['id']}", use_container_width=True):
-                    if on_rename_conversation:
-                        handle_rename_start(conv["id"], conv["title"])
-            
-            with col3:
-                if st.button("Delete", key=f"delete_{conv['id']}", use_container_width=True):
-                    if on_delete_conversation:
-                        on_delete_conversation(conv["id"])
\ No newline at end of file
+    # Only the most recent conversations are listed, a page at a time
+    limit = st.session_state.get("conversation_list_limit", _CONVERSATION_PAGE_SIZE)
+    hidden = len(conversations) - limit
+    conversations = conversations[:limit]
+    
+    # Display all conversation cards in a single markdown element
+    cards = "".join([
+        _CONVERSATION_CARD_TEMPLATE.format_map({
+            "active": "active" if current_conversation_id == conv["id"] else "",
+            "title": sanitize_html_content(conv["title"] or ""),
+            "updated": conv["updated_display"],
+            "message_count": conv["message_count"],
+        })
+        for conv in conversations
+    ])
+    st.sidebar.markdown(cards, unsafe_allow_html=True)
+    
+    if hidden > 0:
+        st.sidebar.button(f"Show older ({hidden} more)", key="show_older_conversations_btn",
+                          use_container_width=True, on_click=_show_older_conversations)
+    
+    # One selector and one row of actions, however many conversations exist
+    conversation_ids = [conv["id"] for conv in conversations]
+    titles = {conv["id"]: conv["title"] for conv in conversations}
+    # The keyed selector keeps its value in session state (see
+    # reset_conversation_selector); start it at the current conversation, or
+    # the newest one, whenever that value is missing or no longer listed
+    if st.session_state.get("conversation_selector") not in conversation_ids:
+        st.session_state.conversation_selector = (
+            current_conversation_id if current_conversation_id in titles else conversation_ids[0]
+        )
+    
+    selected_id = st.sidebar.selectbox(
+        "Conversation",
+        options=conversation_ids,
+        format_func=lambda conversation_id: titles[conversation_id],
+        key="conversation_selector"
+    )
+    is_active = current_conversation_id == selected_id
+    
+    col1, col2, col3 = st.sidebar.columns(3)
+    with col1:
+        st.button("Load", key="load_conversation_btn", use_container_width=True,
+                  disabled=is_active, on_click=on_load_conversation, args=(selected_id,))
+    
+    with col2:
+        st.button("Rename", key="rename_conversation_btn", use_container_width=True,
+                  on_click=handle_rename_start if on_rename_conversation else None,
+                  args=(selected_id, titles[selected_id]))
+    
+    with col3:
+        st.button("Delete", key="delete_conversation_btn", use_container_width=True,
+                  on_click=on_delete_conversation, args=(selected_id,))
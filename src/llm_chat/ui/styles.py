@@ -1,10 +1,59 @@
 """CSS styles for the Streamlit UI."""
+import re
+from functools import lru_cache
+from pathlib import Path
+
 import streamlit as st
 
+# Directory holding the static stylesheets shipped with the package
+STATIC_DIR = Path(__file__).parent / "static"
 
-def apply_base_styles():
-    """Apply base CSS styles to the Streamlit app."""
-    st.markdown("""
+_CSS_COMMENT_RE = re.compile(r"/\*.*?\*/", re.S)
+_CSS_SPACE_RE = re.compile(r"\s+")
+_CSS_PUNCT_SPACE_RE = re.compile(r"\s*([{};,>])\s*")
+
+
+def _minify(css: str) -> str:
+    """Strip comments and redundant whitespace from a CSS block.
+    
+    Args:
+        css: CSS text, optionally wrapped in a <style> tag
+        
+    Returns:
+        The minified CSS
+    """
+    css = _CSS_COMMENT_RE.sub("", css)
+    css = _CSS_SPACE_RE.sub(" ", css)
+    css = _CSS_PUNCT_SPACE_RE.sub(r"\1", css)
+    return css.replace(": ", ":").strip()
+
+
+@lru_cache(maxsize=None)
+def load_static_css(filename: str) -> str:
+    """Read a stylesheet from the static directory.
+    
+    The file is read from disk once per process.
+    
+    Args:
+        filename: Name of the stylesheet in the static directory
+        
+    Returns:
+        The stylesheet wrapped in a <style> tag
+    """
+    css = (STATIC_DIR / filename).read_text(encoding="utf-8")
+    return f"<style>\n{css}</style>"
+
+
+def apply_static_css(filename: str) -> None:
+    """Inject a stylesheet from the static directory into the page.
+    
+    Args:
+        filename: Name of the stylesheet in the static directory
+    """
+    st.markdown(load_static_css(filename), unsafe_allow_html=True)
+
+
+_BASE_CSS = _minify("""
     <style>
     .chat-message {
         padding: 1rem 1.5rem;
@@ -126,12 +175,15 @@ def apply_base_styles():
         font-weight: 500;
     }
     </style>
-    """, unsafe_allow_html=True)
+    """)
 
 
-def apply_code_highlighting():
-    """Apply enhanced syntax highlighting for code blocks."""
-    st.markdown("""
+def apply_base_styles():
+    """Apply base CSS styles to the Streamlit app."""
+    st.markdown(_BASE_CSS, unsafe_allow_html=True)
+
+
+_CODE_HIGHLIGHTING_CSS = _minify("""
     <style>
     /* Inline code */
     code {
@@ -177,10 +229,15 @@ def apply_code_highlighting():
         text-transform: uppercase;
     }
     </style>
-    """, unsafe_allow_html=True)
+    """)
 
-def apply_header_and_input_styles():
-    st.markdown("""
+
+def apply_code_highlighting():
+    """Apply enhanced syntax highlighting for code blocks."""
+    st.markdown(_CODE_HIGHLIGHTING_CSS, unsafe_allow_html=True)
+
+
+_HEADER_AND_INPUT_CSS = _minify("""
     <style>
     /* Main header styling */
     .main-header {
@@ -266,10 +323,14 @@ def apply_header_and_input_styles():
         100% { opacity: 0.4; transform: scale(1); }
     }
     </style>
-    """, unsafe_allow_html=True)
+    """)
 
-def apply_sidebar_styles():
-    st.markdown("""
+
+def apply_header_and_input_styles():
+    st.markdown(_HEADER_AND_INPUT_CSS, unsafe_allow_html=True)
+
+
+_SIDEBAR_CSS = _minify("""
     <style>
     /* Sidebar enhancements */
     .sidebar-header {
@@ -401,13 +462,17 @@ def apply_sidebar_styles():
         margin-top: 0.5rem;
     }
     </style>
-    """, unsafe_allow_html=True)
+    """)
 
-def apply_animations():
-    st.markdown("""
+
+def apply_sidebar_styles():
+    st.markdown(_SIDEBAR_CSS, unsafe_allow_html=True)
+
+
+_ANIMATIONS_CSS = _minify("""
     <style>
-    /* General transitions */
-    * {
+    /* Button transitions (the cards and messages declare their own) */
+    button {
         transition: background-color 0.2s ease, box-shadow 0.2s ease, transform 0.2s ease;
     }
     
@@ -465,11 +530,14 @@ def apply_animations():
         transition: 0s;
     }
     </style>
-    """, unsafe_allow_html=True)
+    """)
 
-def apply_layout_fixes():
-    """Apply fixes for common layout issues."""
-    st.markdown("""
+
+def apply_animations():
+    st.markdown(_ANIMATIONS_CSS, unsafe_allow_html=True)
+
+
+_LAYOUT_FIXES_CSS = _minify("""
     <style>
     /* Fix for the overlapping bar issue */
     .main .block-container {
@@ -498,24 +566,43 @@ def apply_layout_fixes():
         box-shadow: 0 -2px 5px rgba(0,0,0,0.1) !important;
     }
     </style>
-    """, unsafe_allow_html=True)
+    """)
 
 
-def apply_theme():
-    """Apply the light theme to the app."""
-    # Apply base styles
-    apply_base_styles()
+def apply_layout_fixes():
+    """Apply fixes for common layout issues."""
+    st.markdown(_LAYOUT_FIXES_CSS, unsafe_allow_html=True)
 
-    # Apply header and input styles
-    apply_header_and_input_styles()
 
-    # Apply sidebar and styles
-    apply_sidebar_styles
-    
-    # Apply code highlighting
-    apply_code_highlighting()
+def _style_body(block: str) -> str:
+    """Strip the surrounding <style> tags from a CSS block constant."""
+    return block.strip().removeprefix("<style>").removesuffix("</style>")
+
 
-    # Apply animations
-    apply_animations
+@lru_cache(maxsize=1)
+def _theme_html() -> str:
+    """Build the combined theme stylesheet.
+    
+    The CSS blocks are joined into a single <style> tag once per process.
+    
+    Returns:
+        The theme stylesheet wrapped in a <style> tag
+    """
+    blocks = (
+        _BASE_CSS,
+        _HEADER_AND_INPUT_CSS,
+        _SIDEBAR_CSS,
+        _CODE_HIGHLIGHTING_CSS,
+        _ANIMATIONS_CSS,
+        _LAYOUT_FIXES_CSS,
+    )
+    return "<style>" + "".join(_style_body(block) for block in blocks) + "</style>"
 
-    apply_layout_fixes()
\ No newline at end of file
+
+def apply_theme():
+    """Apply the light theme to the app.
+    
+    The stylesheet is emitted on every run (Streamlit drops elements a rerun
+    does not emit again), but as one element built once per process.
+    """
+    st.markdown(_theme_html(), unsafe_allow_html=True)
@@ -1,12 +1,18 @@
 """Utility functions for the application."""
 from datetime import datetime
 from typing import Dict, Any, Optional, List
+import html
 import logging
 import os
 import json
+import re
+import time
 
 logger = logging.getLogger(__name__)
 
+# Characters that html.escape rewrites
+_HTML_SPECIAL_RE = re.compile(r"[&<>\"']")
+
 
 def format_timestamp(timestamp: Optional[str] = None) -> str:
     """Format timestamp for display.
@@ -17,16 +23,14 @@ def format_timestamp(timestamp: Optional[str] = None) -> str:
     Returns:
         Formatted timestamp string
     """
-    if timestamp is None:
-        dt = datetime.now()
-    else:
+    if timestamp is not None:
         try:
-            dt = datetime.fromisoformat(timestamp)
+            return datetime.fromisoformat(timestamp).strftime("%H:%M:%S")
         except (ValueError, TypeError):
             # Invalid timestamp, use current time
-            dt = datetime.now()
+            pass
     
-    return dt.strftime("%H:%M:%S")
+    return time.strftime("%H:%M:%S")
 
 
 def format_date_for_display(date_str: str) -> str:
@@ -93,7 +97,9 @@ def sanitize_html_content(content: str) -> str:
     Returns:
         Sanitized content
     """
-    import html
+    # Plain text (the common case) needs no escaping
+    if not _HTML_SPECIAL_RE.search(content):
+        return content
     return html.escape(content)
 
 
@@ -111,8 +117,10 @@ def get_conversation_title_from_messages(messages: List[Dict[str, Any]]) -> str:
     
     if first_user_msg and first_user_msg.get("content"):
         content = first_user_msg["content"]
-        title = " ".join(content.split()[:5])
-        if len(content.split()) > 5:
+        # Split off at most six words rather than tokenizing the whole message
+        words = content.split(None, 5)
+        title = " ".join(words[:5])
+        if len(words) > 5:
             title += "..."
         return title
     
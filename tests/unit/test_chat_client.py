@@ -1,4 +1,5 @@
 """Tests for the OpenAI chat client."""
+import asyncio
 import pytest
 from unittest.mock import patch, MagicMock
 import sys
@@ -9,7 +10,7 @@ src_dir = Path(__file__).parent.parent.parent / "src"
 if str(src_dir) not in sys.path:
     sys.path.append(str(src_dir))
 
-from src.llm_chat.chat.client import ChatClient
+from src.llm_chat.chat.client import ChatClient, SemanticCache, StreamBuffer
 
 
 def test_client_initialization_without_api_key():
@@ -77,3 +78,314 @@ def test_get_completion_no_client():
     assert isinstance(response, str)
     assert len(response) > 0  # Ensure we get some response
     # You could also check for specific fallback behavior if desired
+
+
+@patch('src.llm_chat.chat.client.AsyncOpenAI')
+@patch('src.llm_chat.chat.client.OpenAI')
+def test_get_completions_batch(mock_openai, mock_async_openai):
+    """Test getting several completions concurrently."""
+    # Arrange
+    mock_instance = MagicMock()
+    mock_async_openai.return_value = mock_instance
+    
+    async def fake_create(**kwargs):
+        response = MagicMock()
+        response.choices = [MagicMock()]
+        response.choices[0].message.content = f"Echo: {kwargs['messages'][0]['content']}"
+        return response
+    
+    mock_instance.chat.completions.create.side_effect = fake_create
+    client = ChatClient(api_key="test_key")
+    
+    # Act
+    responses = client.get_completions_batch(
+        [[{"role": "user", "content": "One"}], [{"role": "user", "content": "Two"}]],
+        max_concurrency=1
+    )
+    
+    # Assert
+    assert responses == ["Echo: One", "Echo: Two"]
+    assert mock_instance.chat.completions.create.call_count == 2
+
+
+def test_semantic_cache_lookup():
+    """Test exact and similarity lookups in the semantic cache."""
+    # Arrange
+    cache = SemanticCache(threshold=0.9)
+    context = SemanticCache.make_key("gpt-3.5-turbo", "system")
+    key = SemanticCache.make_key("gpt-3.5-turbo", "system", "Hello")
+    
+    # Act
+    cache.add(key, context, [1.0, 0.0, 0.0], "Cached response")
+    
+    # Assert
+    assert cache.get_exact(key) == "Cached response"
+    assert cache.get_similar(context, [0.99, 0.05, 0.0]) == "Cached response"
+    assert cache.get_similar(context, [0.0, 1.0, 0.0]) is None
+    assert cache.get_similar("other-context", [1.0, 0.0, 0.0]) is None
+
+
+def test_semantic_cache_evicts_oldest_entry():
+    """Test that a full cache evicts its oldest entry."""
+    # Arrange
+    cache = SemanticCache(max_entries=2)
+    
+    # Act
+    cache.add("a", "ctx", [1.0, 0.0], "A")
+    cache.add("b", "ctx", [0.0, 1.0], "B")
+    cache.add("c", "ctx", [-1.0, 0.0], "C")
+    
+    # Assert
+    assert len(cache) == 2
+    assert cache.get_exact("a") is None
+    assert cache.get_similar("ctx", [1.0, 0.0]) is None
+    assert cache.get_exact("b") == "B"
+    assert cache.get_exact("c") == "C"
+    assert cache.get_similar("ctx", [-1.0, 0.0]) == "C"
+
+
+@patch('src.llm_chat.chat.client.OpenAI')
+def test_get_completion_uses_cache(mock_openai):
+    """Test that repeated prompts are answered from the cache."""
+    # Arrange
+    mock_instance = MagicMock()
+    mock_openai.return_value = mock_instance
+    mock_response = MagicMock()
+    mock_response.choices = [MagicMock()]
+    mock_response.choices[0].message.content = "Test response"
+    mock_instance.chat.completions.create.return_value = mock_response
+    mock_instance.embeddings.create.return_value.data = [MagicMock(embedding=[0.5, 0.5])]
+    
+    client = ChatClient(api_key="test_key", cache=SemanticCache())
+    messages = [{"role": "user", "content": "Hello"}]
+    
+    # Act
+    first = client.get_completion(messages, temperature=0)
+    second = client.get_completion(messages, temperature=0)
+    
+    # Assert
+    assert first == second == "Test response"
+    mock_instance.chat.completions.create.assert_called_once()
+
+
+@patch('src.llm_chat.chat.client.OpenAI')
+def test_get_completion_cache_requires_zero_temperature_or_opt_in(mock_openai):
+    """Test that sampled completions are cached only when the cache opts in."""
+    # Arrange
+    mock_instance = MagicMock()
+    mock_openai.return_value = mock_instance
+    mock_response = MagicMock()
+    mock_response.choices = [MagicMock()]
+    mock_response.choices[0].message.content = "Test response"
+    mock_instance.chat.completions.create.return_value = mock_response
+    mock_instance.embeddings.create.return_value.data = [MagicMock(embedding=[0.5, 0.5])]
+    
+    client = ChatClient(api_key="test_key")
+    messages = [{"role": "user", "content": "Hello"}]
+    default_cache = SemanticCache()
+    opted_in_cache = SemanticCache(any_temperature=True)
+    
+    # Act
+    client.get_completion(messages, temperature=0.7, cache=default_cache)
+    client.get_completion(messages, temperature=0.7, cache=default_cache)
+    client.get_completion(messages, temperature=0.7, cache=opted_in_cache)
+    client.get_completion(messages, temperature=0.7, cache=opted_in_cache)
+    
+    # Assert
+    assert len(default_cache) == 0
+    mock_instance.embeddings.create.assert_called_once()
+    assert mock_instance.chat.completions.create.call_count == 3
+
+
+@patch('src.llm_chat.chat.client.OpenAI')
+def test_stream_completion(mock_openai):
+    """Test streaming a completion from the API."""
+    # Arrange
+    mock_instance = MagicMock()
+    mock_openai.return_value = mock_instance
+    
+    chunks = []
+    for token in ["Hel", "lo", None]:
+        chunk = MagicMock()
+        chunk.choices = [MagicMock()]
+        chunk.choices[0].delta.content = token
+        chunks.append(chunk)
+    mock_instance.chat.completions.create.return_value = iter(chunks)
+    
+    client = ChatClient(api_key="test_key")
+    
+    # Act
+    pieces = list(client.stream_completion([{"role": "user", "content": "Hi"}], min_interval=0))
+    
+    # Assert
+    assert "".join(pieces) == "Hello"
+    assert mock_instance.chat.completions.create.call_args.kwargs["stream"] is True
+
+
+@patch('src.llm_chat.chat.client.OpenAI')
+def test_stream_completion_yields_first_token_immediately(mock_openai):
+    """Test that the first token is not coalesced with later ones."""
+    # Arrange
+    mock_instance = MagicMock()
+    mock_openai.return_value = mock_instance
+    
+    chunks = []
+    for token in ["Hel", "lo", "!"]:
+        chunk = MagicMock()
+        chunk.choices = [MagicMock()]
+        chunk.choices[0].delta.content = token
+        chunks.append(chunk)
+    mock_instance.chat.completions.create.return_value = iter(chunks)
+    
+    client = ChatClient(api_key="test_key")
+    
+    # Act
+    pieces = list(client.stream_completion([{"role": "user", "content": "Hi"}], min_interval=60))
+    
+    # Assert
+    assert pieces == ["Hel", "lo!"]
+
+
+@patch('src.llm_chat.chat.client.AsyncOpenAI')
+@patch('src.llm_chat.chat.client.OpenAI')
+def test_astream_completion(mock_openai, mock_async_openai):
+    """Test streaming a completion with the async client."""
+    # Arrange
+    mock_instance = MagicMock()
+    mock_async_openai.return_value = mock_instance
+    
+    async def fake_stream():
+        for token in ["Hel", None, "lo"]:
+            chunk = MagicMock()
+            chunk.choices = [MagicMock()]
+            chunk.choices[0].delta.content = token
+            yield chunk
+    
+    async def fake_create(**kwargs):
+        return fake_stream()
+    
+    mock_instance.chat.completions.create.side_effect = fake_create
+    client = ChatClient(api_key="test_key")
+    
+    async def collect():
+        return [piece async for piece in client.astream_completion([{"role": "user", "content": "Hi"}])]
+    
+    # Act
+    pieces = asyncio.run(collect())
+    
+    # Assert
+    assert pieces == ["Hel", "lo"]
+    assert mock_instance.chat.completions.create.call_args.kwargs["stream"] is True
+
+
+def test_stream_buffer_flushes_on_size():
+    """Test that the stream buffer flushes once enough characters are buffered."""
+    # Arrange
+    chunks = ["a", "bb", "cc", "d", "e"]
+    
+    # Act
+    pieces = list(StreamBuffer(chunks, max_chars=4, min_interval=60))
+    
+    # Assert
+    assert pieces == ["a", "bbcc", "de"]
+
+
+@patch('src.llm_chat.chat.client.OpenAI')
+def test_get_completion_cache_keyed_by_sampling_params(mock_openai):
+    """Test that a prompt repeated with other sampling parameters is not served from the cache."""
+    # Arrange
+    mock_instance = MagicMock()
+    mock_openai.return_value = mock_instance
+    mock_response = MagicMock()
+    mock_response.choices = [MagicMock()]
+    mock_response.choices[0].message.content = "Test response"
+    mock_instance.chat.completions.create.return_value = mock_response
+    mock_instance.embeddings.create.return_value.data = [MagicMock(embedding=[0.5, 0.5])]
+    
+    client = ChatClient(api_key="test_key", cache=SemanticCache(any_temperature=True))
+    messages = [{"role": "user", "content": "Hello"}]
+    
+    # Act
+    client.get_completion(messages, temperature=0)
+    client.get_completion(messages, temperature=1)
+    
+    # Assert
+    assert mock_instance.chat.completions.create.call_count == 2
+
+
+@patch('src.llm_chat.chat.client.OpenAI')
+def test_similarity_cache_scoped_to_earlier_turns(mock_openai):
+    """Test that a follow-up is not answered from a conversation with other earlier turns."""
+    # Arrange
+    mock_instance = MagicMock()
+    mock_openai.return_value = mock_instance
+    mock_response = MagicMock()
+    mock_response.choices = [MagicMock()]
+    mock_response.choices[0].message.content = "Test response"
+    mock_instance.chat.completions.create.return_value = mock_response
+    mock_instance.embeddings.create.return_value.data = [MagicMock(embedding=[0.5, 0.5])]
+    
+    client = ChatClient(api_key="test_key")
+    cache = SemanticCache()
+    first = [{"role": "user", "content": "What is Python?"}, {"role": "assistant", "content": "A language."},
+             {"role": "user", "content": "Tell me more"}]
+    second = [{"role": "user", "content": "What is Rust?"}, {"role": "assistant", "content": "A language."},
+              {"role": "user", "content": "Tell me more!"}]
+    
+    # Act
+    client.get_completion(first, temperature=0, cache=cache)
+    client.get_completion(second, temperature=0, cache=cache)
+    
+    # Assert
+    assert mock_instance.chat.completions.create.call_count == 2
+
+
+@patch('src.llm_chat.chat.client.OpenAI')
+def test_similarity_cache_hits_only_after_same_history(mock_openai):
+    """Test that a question repeated later in a conversation misses, but one opening a new chat hits."""
+    # Arrange
+    mock_instance = MagicMock()
+    mock_openai.return_value = mock_instance
+    mock_response = MagicMock()
+    mock_response.choices = [MagicMock()]
+    mock_response.choices[0].message.content = "Test response"
+    mock_instance.chat.completions.create.return_value = mock_response
+    mock_instance.embeddings.create.return_value.data = [MagicMock(embedding=[0.5, 0.5])]
+    
+    client = ChatClient(api_key="test_key")
+    cache = SemanticCache()
+    system = {"role": "system", "content": "Be helpful."}
+    opening = [system, {"role": "user", "content": "What is Python?"}]
+    repeated = opening + [{"role": "assistant", "content": "Test response"},
+                          {"role": "user", "content": "What is Python?"}]
+    new_chat = [system, {"role": "user", "content": "What's Python?"}]
+    
+    # Act
+    client.get_completion(opening, temperature=0, cache=cache)
+    client.get_completion(repeated, temperature=0, cache=cache)
+    calls_before_new_chat = mock_instance.chat.completions.create.call_count
+    client.get_completion(new_chat, temperature=0, cache=cache)
+    
+    # Assert
+    assert calls_before_new_chat == 2
+    assert mock_instance.chat.completions.create.call_count == 2
+
+
+@patch('src.llm_chat.chat.client.OpenAI')
+def test_get_completion_without_cache_skips_embeddings(mock_openai):
+    """Test that no embedding request is made when caching is off."""
+    # Arrange
+    mock_instance = MagicMock()
+    mock_openai.return_value = mock_instance
+    mock_response = MagicMock()
+    mock_response.choices = [MagicMock()]
+    mock_response.choices[0].message.content = "Test response"
+    mock_instance.chat.completions.create.return_value = mock_response
+    
+    client = ChatClient(api_key="test_key")
+    
+    # Act
+    client.get_completion([{"role": "user", "content": "Hello"}])
+    
+    # Assert
+    mock_instance.embeddings.create.assert_not_called()
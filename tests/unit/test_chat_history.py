@@ -139,4 +139,85 @@ def test_auto_generate_title(temp_history_dir):
     loaded_conv = manager.load_conversation(conv_id)
     
     # Assert
-    assert "This should be the title" in loaded_conv["title"]
\ No newline at end of file
+    assert "This should be the title" in loaded_conv["title"]
+
+def test_list_conversations_cache_invalidated_on_save(temp_history_dir):
+    """Test that the cached listing is reused until a conversation is saved."""
+    # Arrange
+    manager = ChatHistoryManager(storage_dir=temp_history_dir)
+    manager.save_conversation(messages=[{"role": "user", "content": "One"}], conversation_id="one")
+    
+    # Act
+    first = manager.list_conversations()
+    second = manager.list_conversations()
+    manager.save_conversation(messages=[{"role": "user", "content": "Two"}], conversation_id="two")
+    third = manager.list_conversations()
+    
+    # Assert
+    assert first is second
+    assert len(third) == 2
+
+
+def test_list_conversations_includes_display_date(temp_history_dir):
+    """Test that listed conversations carry a pre-formatted update date."""
+    # Arrange
+    manager = ChatHistoryManager(storage_dir=temp_history_dir)
+    manager.save_conversation(messages=[{"role": "user", "content": "Hello"}], conversation_id="one")
+    
+    # Act
+    conversation = manager.list_conversations()[0]
+    
+    # Assert
+    expected = datetime.fromisoformat(conversation["updated"]).strftime("%b %d, %Y %H:%M")
+    assert conversation["updated_display"] == expected
+
+
+def test_list_conversations_reads_metadata_index(temp_history_dir):
+    """Test that listing uses the metadata index kept up to date on writes."""
+    # Arrange
+    manager = ChatHistoryManager(storage_dir=temp_history_dir)
+    manager.save_conversation(messages=[{"role": "user", "content": "One"}], conversation_id="one")
+    manager.save_conversation(messages=[{"role": "user", "content": "Two"}], conversation_id="two")
+    manager.rename_conversation("one", "Renamed")
+    manager.delete_conversation("two")
+    
+    # Act
+    with open(manager.index_path, encoding="utf-8") as f:
+        index = json.load(f)
+    conversations = ChatHistoryManager(storage_dir=temp_history_dir).list_conversations()
+    
+    # Assert
+    assert list(index) == ["one"]
+    assert index["one"]["title"] == "Renamed"
+    assert [c["title"] for c in conversations] == ["Renamed"]
+
+
+def test_list_conversations_rebuilds_missing_index(temp_history_dir):
+    """Test that the metadata index is rebuilt from the conversation files."""
+    # Arrange
+    manager = ChatHistoryManager(storage_dir=temp_history_dir)
+    manager.save_conversation(messages=[{"role": "user", "content": "One"}], conversation_id="one")
+    os.remove(manager.index_path)
+    
+    # Act
+    conversations = ChatHistoryManager(storage_dir=temp_history_dir).list_conversations()
+    
+    # Assert
+    assert [c["id"] for c in conversations] == ["one"]
+    assert os.path.exists(manager.index_path)
+
+
+def test_generated_ids_are_unique_within_a_second(temp_history_dir):
+    """Test that conversations saved back to back get distinct IDs."""
+    # Arrange
+    manager = ChatHistoryManager(storage_dir=temp_history_dir)
+    messages = [{"role": "user", "content": "Hello"}]
+    
+    # Act
+    first = manager.save_conversation(messages=messages)
+    second = manager.save_conversation(messages=messages)
+    
+    # Assert
+    assert first != second
+    assert first < second
+    assert len(manager.list_conversations()) == 2
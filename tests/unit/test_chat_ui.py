@@ -0,0 +1,135 @@
+# tests/test_chat_ui.py
+import pytest
+from unittest.mock import MagicMock
+
+from src.llm_chat.chat import message as message_module
+from src.llm_chat.chat.message import Conversation, Message
+from src.llm_chat.chat.system_prompts import system_prompt_manager
+from src.llm_chat.ui import chat_ui
+from src.llm_chat.ui.chat_ui import format_message, format_messages
+
+
+def test_format_message_user():
+    """Test formatting a user message."""
+    # Arrange
+    message = Message("user", "Hello\nthere", timestamp="12:00:00")
+    
+    # Act
+    html = format_message(message)
+    
+    # Assert
+    assert "You" in html
+    assert "12:00:00" in html
+    assert "Hello<br>there" in html
+    assert "\n" not in html
+
+
+def test_format_message_uses_assistant_type():
+    """Test that assistant messages use the assistant type name and icon."""
+    # Arrange
+    assistant_type = system_prompt_manager.get_assistant_type("coding")
+    message = Message.assistant_message("Hi")
+    
+    # Act
+    html = format_message(message, assistant_type)
+    
+    # Assert
+    assert assistant_type.name in html
+    assert assistant_type.icon in html
+
+
+def test_format_messages_joins_all():
+    """Test formatting several messages into one HTML string."""
+    # Arrange
+    messages = [Message.user_message("First"), Message.assistant_message("Second")]
+    
+    # Act
+    html = format_messages(messages)
+    
+    # Assert
+    assert html.index("First") < html.index("Second")
+
+
+def test_render_streaming_message_returns_raw_text(monkeypatch):
+    """Test that streamed chunks are escaped for display but returned raw."""
+    # Arrange
+    placeholder = MagicMock()
+    monkeypatch.setattr(chat_ui.st, "empty", lambda: placeholder)
+    
+    # Act
+    text = chat_ui.render_streaming_message(["a <b", "> & c"])
+    
+    # Assert
+    assert text == "a <b> & c"
+    assert "a &lt;b&gt; &amp; c" in placeholder.markdown.call_args.args[0]
+
+
+def test_render_streaming_message_matches_finished_message(monkeypatch):
+    """Test that the streamed markup equals the markup of the finished message."""
+    # Arrange
+    placeholder = MagicMock()
+    monkeypatch.setattr(chat_ui.st, "empty", lambda: placeholder)
+    monkeypatch.setattr(message_module, "_current_time_str", lambda: "12:00")
+    
+    # Act
+    text = chat_ui.render_streaming_message(["Hello\n", "<world>"])
+    
+    # Assert
+    html = placeholder.markdown.call_args.args[0]
+    finished = Message.assistant_message("Hello\n&lt;world&gt;")
+    assert text == "Hello\n<world>"
+    assert placeholder.markdown.call_count == 2
+    assert html == format_message(finished)
+
+
+def test_render_conversation_window():
+    """Test that only the most recent messages are rendered."""
+    # Arrange
+    conversation = Conversation()
+    for i in range(5):
+        conversation.add_message(Message.user_message(f"Message {i}"))
+    target = MagicMock()
+    
+    # Act
+    chat_ui.render_conversation(conversation, target=target, max_messages=2)
+    
+    # Assert
+    html = target.markdown.call_args.args[0]
+    assert "Message 2" not in html
+    assert "Message 3" in html and "Message 4" in html
+
+
+def test_format_message_html_is_memoized():
+    """Test that re-formatting an unchanged message is served from the cache."""
+    # Arrange
+    chat_ui._cached_message_html.cache_clear()
+    message = Message("user", "Cached", timestamp="12:00:00")
+    
+    # Act
+    first = format_message(message)
+    second = format_message(Message("user", "Cached", timestamp="12:00:00"))
+    
+    # Assert
+    assert first == second
+    assert chat_ui._cached_message_html.cache_info().hits == 1
+
+
+def test_render_conversation_reuses_html_until_changed(monkeypatch):
+    """Test that an unchanged conversation is not re-formatted on rerun."""
+    # Arrange
+    conversation = Conversation(messages=[Message.user_message("Hello")])
+    calls = []
+    original = chat_ui.format_messages
+    monkeypatch.setattr(chat_ui, "format_messages", lambda *args: calls.append(1) or original(*args))
+    target = MagicMock()
+    
+    # Act
+    chat_ui.render_conversation(conversation, target=target)
+    chat_ui.render_conversation(conversation, target=target)
+    conversation.add_message(Message.assistant_message("Hi"))
+    chat_ui.render_conversation(conversation, target=target)
+    
+    # Assert
+    assert len(calls) == 2
+    assert target.markdown.call_count == 3
+    assert "Hi" in target.markdown.call_args.args[0]
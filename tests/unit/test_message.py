@@ -107,4 +107,102 @@ def test_conversation_api_messages():
     assert len(api_messages) == 2
     assert "timestamp" not in api_messages[0]
     assert api_messages[0]["role"] == "user"
-    assert api_messages[0]["content"] == "Hello"
\ No newline at end of file
+    assert api_messages[0]["content"] == "Hello"
+
+def test_message_to_api_dict_tracks_content():
+    """Test that the cached API dict follows content changes."""
+    # Arrange
+    message = Message.user_message("Hello")
+    
+    # Act
+    first = message.to_api_dict()
+    message.content = "Changed"
+    second = message.to_api_dict()
+    
+    # Assert
+    assert first == {"role": "user", "content": "Hello"}
+    assert second == {"role": "user", "content": "Changed"}
+    assert message.to_api_dict() is second
+
+
+def test_conversation_api_messages_follow_updates():
+    """Test that cached API messages track new messages and prompt changes."""
+    # Arrange
+    conversation = Conversation(system_prompt="Be brief")
+    conversation.add_message(Message.user_message("Hello"))
+    first = conversation.get_api_messages()
+    
+    # Act
+    conversation.add_message(Message.assistant_message("Hi"))
+    conversation.set_system_prompt("Be verbose")
+    second = conversation.get_api_messages()
+    
+    # Assert
+    assert len(first) == 2
+    assert [m["content"] for m in second] == ["Be verbose", "Hello", "Hi"]
+
+
+def test_conversation_last_user_message():
+    """Test finding the most recent user message."""
+    # Arrange
+    conversation = Conversation()
+    
+    # Act & Assert
+    assert conversation.get_last_user_message() is None
+    conversation.add_message(Message.user_message("First"))
+    conversation.add_message(Message.user_message("Second"))
+    conversation.add_message(Message.assistant_message("Reply"))
+    assert conversation.get_last_user_message().content == "Second"
+
+
+def test_conversation_api_messages_window():
+    """Test limiting API messages to the most recent window."""
+    # Arrange
+    conversation = Conversation(system_prompt="System")
+    for i in range(5):
+        conversation.add_message(Message.user_message(f"Message {i}"))
+    
+    # Act
+    api_messages = conversation.get_api_messages(max_messages=2)
+    
+    # Assert
+    assert [m["content"] for m in api_messages] == ["System", "Message 3", "Message 4"]
+    assert len(conversation.get_api_messages()) == 6
+
+
+def test_conversation_api_messages_window_starts_at_user_turn():
+    """Test that the window does not open with an orphaned assistant reply."""
+    # Arrange
+    conversation = Conversation()
+    for i in range(3):
+        conversation.add_message(Message.user_message(f"Question {i}"))
+        conversation.add_message(Message.assistant_message(f"Answer {i}"))
+    
+    # Act
+    api_messages = conversation.get_api_messages(max_messages=3)
+    
+    # Assert
+    assert [m["content"] for m in api_messages] == ["Question 2", "Answer 2"]
+
+
+def test_conversation_updated_at():
+    """Test that adding a message refreshes the update timestamp."""
+    # Arrange
+    conversation = Conversation.from_dict({"updated": "2024-01-01T00:00:00", "messages": []})
+    
+    # Act & Assert
+    assert conversation.updated_at == "2024-01-01T00:00:00"
+    conversation.add_message(Message.user_message("Hello"))
+    assert conversation.updated_at > "2024-01-01T00:00:00"
+    assert conversation.to_dict()["updated"] == conversation.updated_at
+
+
+def test_conversation_messages_view_is_read_only():
+    """Test that messages can only be added through add_message."""
+    # Arrange
+    conversation = Conversation(messages=[Message.user_message("Hello")])
+    
+    # Act & Assert
+    assert conversation.messages[0].content == "Hello"
+    assert not hasattr(conversation.messages, "append")
+    assert conversation.get_last_user_message().content == "Hello"
@@ -0,0 +1,16 @@
+# tests/test_styles.py
+from src.llm_chat.ui.styles import _theme_html
+
+
+def test_theme_html_includes_all_blocks():
+    """Test that the theme stylesheet ships every CSS block in one style tag."""
+    # Act
+    html = _theme_html()
+    
+    # Assert
+    assert html.count("<style>") == 1
+    assert html.endswith("</style>")
+    assert ".chat-message{" in html
+    assert ".conversation-card{" in html
+    assert "@keyframes pageTransition" in html
+    assert "/*" not in html
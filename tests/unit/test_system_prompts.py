@@ -0,0 +1,72 @@
+# tests/test_system_prompts.py
+import pytest
+
+from src.llm_chat.chat.system_prompts import AssistantType, SystemPromptManager
+
+
+def test_find_assistant_type_by_prompt():
+    """Test looking up an assistant type from its system prompt."""
+    # Arrange
+    manager = SystemPromptManager()
+    coding = manager.get_assistant_type("coding")
+    
+    # Act & Assert
+    assert manager.find_assistant_type_by_prompt(coding.system_prompt) is coding
+    assert manager.find_assistant_type_by_prompt("Unknown prompt") is None
+
+
+def test_find_assistant_type_by_prompt_after_replace():
+    """Test that replacing an assistant type updates the prompt index."""
+    # Arrange
+    manager = SystemPromptManager()
+    old_prompt = manager.get_system_prompt("finance")
+    
+    # Act
+    manager.add_assistant_type(AssistantType(id="finance", name="Finance", system_prompt="New prompt"))
+    
+    # Assert
+    assert manager.find_assistant_type_by_prompt(old_prompt) is None
+    assert manager.find_assistant_type_by_prompt("New prompt").name == "Finance"
+
+
+def test_welcome_and_switch_messages():
+    """Test pre-formatted welcome and switch messages."""
+    # Arrange
+    manager = SystemPromptManager()
+    
+    # Act & Assert
+    assert "Coding Expert" in manager.get_welcome_message("coding")
+    assert "AI Assistant" in manager.get_welcome_message("unknown")
+    assert "Financial Advisor mode" in manager.get_switch_message("finance")
+    assert manager.get_switch_message("unknown") is None
+    
+    # Replacing a type refreshes its cached messages
+    manager.add_assistant_type(AssistantType(id="coding", name="Code Helper", system_prompt="x"))
+    assert "Code Helper" in manager.get_welcome_message("coding")
+
+
+def test_get_system_prompt_after_replace():
+    """Test that cached system prompts follow assistant type changes."""
+    # Arrange
+    manager = SystemPromptManager()
+    default_prompt = manager.get_system_prompt("general")
+    
+    # Act & Assert
+    assert manager.get_system_prompt("missing") == default_prompt
+    manager.add_assistant_type(AssistantType(id="missing", name="Found", system_prompt="Found prompt"))
+    assert manager.get_system_prompt("missing") == "Found prompt"
+
+
+def test_get_assistant_type_options():
+    """Test that selector labels and IDs follow the registered types."""
+    # Arrange
+    manager = SystemPromptManager()
+    
+    # Act
+    manager.add_assistant_type(AssistantType(id="writer", name="Writer", system_prompt="Write", icon="✍️"))
+    labels, ids = manager.get_assistant_type_options()
+    
+    # Assert
+    assert ids == tuple(at.id for at in manager.get_all_assistant_types())
+    assert labels[-1] == "✍️ Writer"
+    assert ids[-1] == "writer"